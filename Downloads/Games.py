@@ -1,139 +1,655 @@
 #!/usr/bin/env python3
 
-import random
-import sys
-import matplotlib.pyplot as plt
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from statistics import NormalDist
+import numpy as np
+from payoff import PayoffMatrix, outcome_counts
+import machines
+from match_cache import is_deterministic_pair, match_key
+from memory_one import declared_memory_one, is_deterministic, solve_match
+import noise as trembling
+from checkpoint import Checkpoint
+from randomness import make_rng, spawn
+from reporting import JSONLinesReporter, ProgressReporter, Reporter, TextReporter
+from strategies import (TitForTatPlayer, RandomPlayer, GrimTriggerPlayer, GenerousTitForTatPlayer,
+                        RuthlessTitForTatPlayer, SuperForgivingPlayer, SuperUnforgivingPlayer, has_kernel)
 
-class Player:
-    def __init__(self):
-        self.score = 0
-        self.last_action = None
-
-    def update_score(self, reward):
-        self.score += reward
-
-class TitForTatPlayer(Player):
-    def choose_action(self, opponent):
-        if opponent.last_action == 'cooperate' or opponent.last_action is None:
-            return "cooperate"
-        else:
-            return 'defect'
+# Payoffs used by this simulation: R=2, S=-1, T=3, P=0
+PAYOFF = PayoffMatrix(reward=2, sucker=-1, temptation=3, punishment=0)
 
-class RandomPlayer(Player):
-    def choose_action(self, opponent):
-        return random.choice(["cooperate", "defect"])
-
-class GrimTriggerPlayer(Player):
-    def __init__(self):
-        super().__init__()
-        self.triggered = False
-
-    def choose_action(self, opponent):
-        if opponent.last_action == 'defect' or self.triggered:
-            self.triggered = True
-            return 'defect'
-        return 'cooperate'
-
-class ForgivingTitForTatPlayer(Player):
-    def choose_action(self, opponent):
-        if opponent.last_action == 'defect' and random.random() < 0.5:
-            return 'cooperate'
-        return 'defect' if opponent.last_action == 'defect' else 'cooperate'
-
-class RuthlessTitForTatPlayer(Player):
-    def choose_action(self, opponent):
-        if opponent.last_action == 'defect':
-            return 'defect'
-        return 'cooperate'
-
-class SuperForgivingPlayer(Player):
-    def choose_action(self, opponent):
-        return "cooperate"
-
-class SuperUnForgivingPlayer(Player):
-    def choose_action(self, opponent):
-        return "defect"
-
-def play_round(player1, player2):
-    action1 = player1.choose_action(player2)
-    action2 = player2.choose_action(player1)
+def play_round(player1, player2, payoff=PAYOFF, errors=None):
+    # errors is this round's (flip1, flip2, misread1, misread2) in noisy play
+    if errors is None:
+        action1 = player1.choose_action([player2])
+        action2 = player2.choose_action([player1])
+    else:
+        action1, action2 = trembling.noisy_actions(player1, player2, errors)
 
     player1.last_action = action1
     player2.last_action = action2
 
-    if action1 == 'cooperate' and action2 == 'cooperate':
-        reward1 = 2
-        reward2 = 2
-    elif action1 == 'cooperate' and action2 == 'defect':
-        reward1 = -1
-        reward2 = 3
-    elif action1 == 'defect' and action2 == 'cooperate':
-        reward1 = 3
-        reward2 = -1
-    else:  # Both defect
-        reward1 = 0
-        reward2 = 0
+    reward1, reward2 = payoff.outcomes[action1][action2]
 
     player1.update_score(reward1)
     player2.update_score(reward2)
 
-def run_simulation(player1_class, player2_class, rounds=1000, simulations=100):
-    player1_wins = 0
-    player2_wins = 0
-    draws = 0
+def _scalar_scores(player1_class, player2_class, rounds, simulations, payoff, rng, recorder=None,
+                   noise=0.0, misperception=0.0):
+    # Both players' scores in each replicate. A deterministic pair replays
+    # identically, so it plays one replicate standing for all of them.
+    noisy = noise or misperception
+    copies = 1
+    if not noisy and is_deterministic_pair(player1_class, player2_class):
+        simulations, copies = 1, simulations
+    scores1 = np.empty(simulations)
+    scores2 = np.empty(simulations)
 
-    for _ in range(simulations):
-        player1 = player1_class()
-        player2 = player2_class()
+    for k in range(simulations):
+        rng1, rng2 = rng.spawn(2)
+        player1 = player1_class(rng=rng1)
+        player2 = player2_class(rng=rng2)
+        # Errors come from their own stream, so noisy play leaves the players' draws alone
+        errors = (trembling.round_errors(rng.spawn(1)[0], rounds, noise, misperception) if noisy
+                  else repeat(None))
 
-        for _ in range(rounds):
-            play_round(player1, player2)
-
-        if player1.score > player2.score:
-            player1_wins += 1
-        elif player2.score > player1.score:
-            player2_wins += 1
+        if recorder is None:
+            for _ in range(rounds):
+                play_round(player1, player2, payoff, next(errors))
         else:
-            draws += 1
+            match = recorder.new_match(player1_class.__name__, player2_class.__name__, copies=copies)
+            for round_num in range(rounds):
+                play_round(player1, player2, payoff, next(errors))
+                action1, action2 = player1.last_action, player2.last_action
+                recorder.record(match, round_num, action1, action2, *payoff.outcomes[action1][action2])
+
+        scores1[k] = player1.score
+        scores2[k] = player2.score
 
+    return scores1, scores2
+
+def _summary(scores1, scores2, simulations):
+    # Result fields for the per-replicate scores; a single score stands for
+    # all `simulations` identical replicates
+    scores1 = np.broadcast_to(scores1, simulations)
+    scores2 = np.broadcast_to(scores2, simulations)
     return {
-        'player1_wins': player1_wins,
-        'player2_wins': player2_wins,
-        'draws': draws,
-        'player1_average_score': player1.score / simulations,
-        'player2_average_score': player2.score / simulations
+        'player1_wins': int(np.count_nonzero(scores1 > scores2)),
+        'player2_wins': int(np.count_nonzero(scores2 > scores1)),
+        'draws': int(np.count_nonzero(scores1 == scores2)),
+        'player1_average_score': scores1.mean().item(),
+        'player2_average_score': scores2.mean().item()
     }
 
-def plot_results(results, player1_class, player2_class):
-    labels = ['Player 1 Wins', 'Player 2 Wins', 'Draws']
-    values = [results['player1_wins'], results['player2_wins'], results['draws']]
+def _solved_simulation(vector1, vector2, rounds, simulations, payoff):
+    # Expected value of every field of the simulated result; for
+    # deterministic pairs this is exactly what simulating would return.
+    score1, score2, p_win1, p_win2, p_draw = solve_match(vector1, vector2, rounds, payoff)
+    if is_deterministic(vector1) and is_deterministic(vector2):
+        p_win1, p_win2, p_draw = int(p_win1), int(p_win2), int(p_draw)
+    return {
+        'player1_wins': p_win1 * simulations,
+        'player2_wins': p_win2 * simulations,
+        'draws': p_draw * simulations,
+        'player1_average_score': score1,
+        'player2_average_score': score2
+    }
+
+def _solvable(player1_class, player2_class, method, noisy=False):
+    # Noisy play is always simulated: a strategy like GrimTrigger is only
+    # memory-one while it never mistakes its own moves.
+    if method == 'simulate' or noisy:
+        return False
+    vector1 = declared_memory_one(player1_class)
+    vector2 = declared_memory_one(player2_class)
+    if vector1 is None or vector2 is None:
+        return False
+    return method == 'exact' or (is_deterministic(vector1) and is_deterministic(vector2))
+
+# Kernels are declared like any other metadata (see strategies.declared);
+# classes without one fall back to play_round.
+is_batchable = has_kernel
+
+def _batch_kernel(player_class):
+    return (player_class.choose_batch, player_class.init_batch_state, player_class.batch_random,
+            player_class.batch_own_moves)
+
+def _lane_groups(classes, lanes):
+    # Sort lanes by kernel so every distinct kernel owns one contiguous slice
+    # of the side's arrays; classes sharing a kernel share the slice. The
+    # pairings inside a slice keep their original order.
+    kernel_ids = {}
+    keys = np.array([kernel_ids.setdefault(_batch_kernel(cls), len(kernel_ids))
+                     for cls in classes])
+    lane_keys = np.repeat(keys, lanes)
+    order = np.argsort(lane_keys, kind='stable')
+    sorted_keys = lane_keys[order]
+    groups = []
+    members = []
+    for kernel, key in kernel_ids.items():
+        start, stop = np.searchsorted(sorted_keys, [key, key + 1])
+        groups.append((kernel, slice(start, stop)))
+        members.append(np.flatnonzero(keys == key))
+    return order, groups, members
+
+def _draw_uniforms(groups, members, lanes, rngs, size):
+    # Each pairing draws from its own generator, so its random stream does
+    # not depend on which other pairings share the batch.
+    return [np.concatenate([rngs[p].random((size, lanes[p]), dtype=np.float32)
+                            for p in pairing_ids], axis=1)
+            if random_kernel else None
+            for ((_, _, random_kernel, _), _), pairing_ids in zip(groups, members)]
+
+_BATCH_CHUNK = 256
+
+def _draw_errors(lanes, rngs, size, order, noise, misperception):
+    # (size, n, 4) noise masks in side-1 lane order, each pairing's drawn
+    # from its own generator after its uniforms
+    errors = np.concatenate([trembling.masks(rng, (size, count), noise, misperception)
+                             for rng, count in zip(rngs, lanes.tolist())], axis=1)
+    return errors[:, order]
+
+def _batched_scores(pairings, rounds, simulations, payoff, rngs, recorder=None, noise=0.0, misperception=0.0):
+    # Pairings without a stochastic side replay identically, so they only
+    # need one lane whose outcome is shared by all of their replicates
+    # (unless play is noisy).
+    noisy = noise or misperception
+    lanes = np.array([simulations if noisy or p1.batch_random or p2.batch_random else 1
+                      for p1, p2 in pairings])
+    n = int(lanes.sum())
+    order1, groups1, members1 = _lane_groups([p[0] for p in pairings], lanes)
+    order2, groups2, members2 = _lane_groups([p[1] for p in pairings], lanes)
+
+    # Each side is stored in its own sorted order; these index arrays
+    # translate one side's actions into the other side's lane order.
+    inverse1 = np.empty(n, dtype=np.intp)
+    inverse1[order1] = np.arange(n)
+    inverse2 = np.empty(n, dtype=np.intp)
+    inverse2[order2] = np.arange(n)
+    to_side1 = inverse2[order1]
+    to_side2 = inverse1[order2]
+
+    if recorder is not None:
+        # One recorded match per lane; a collapsed lane stands for all replicates
+        first = len(recorder.matches)
+        for (p1, p2), count in zip(pairings, lanes.tolist()):
+            for _ in range(count):
+                recorder.new_match(p1.__name__, p2.__name__, copies=simulations // count)
+        side1_matches = first + order1
+
+    state1 = [init(s.stop - s.start) for (_, init, _, _), s in groups1]
+    state2 = [init(s.stop - s.start) for (_, init, _, _), s in groups2]
+    own_moves2 = any(own for (_, _, _, own), _ in groups2)
+
+    # Moves are written straight into chunked history buffers (player 2's
+    # history is kept in side-1 order) and only summed once per chunk.
+    chunk = max(1, min(rounds, _BATCH_CHUNK))
+    history1 = np.empty((chunk, n), dtype=bool)
+    history2 = np.empty((chunk, n), dtype=bool)
+    action2 = np.empty(n, dtype=bool)
+    last1 = np.zeros(n, dtype=bool)
+    last2 = np.zeros(n, dtype=bool)
+    # Kernels see a match as a group game against one opponent: defectors
+    # is the opponent's last move and cooperators its negation, both zero
+    # before the first round.
+    degree1 = [np.ones(s.stop - s.start) for _, s in groups1]
+    degree2 = [np.ones(s.stop - s.start) for _, s in groups2]
+    nobody = np.zeros(n, dtype=bool)
+    defects1 = np.zeros(n, dtype=np.int64)
+    defects2 = np.zeros(n, dtype=np.int64)
+    mutual_defects = np.zeros(n, dtype=np.int64)
+
+    for start in range(0, rounds, chunk):
+        size = min(chunk, rounds - start)
+        # Stochastic strategies get their uniforms for the whole chunk at once.
+        uniforms1 = _draw_uniforms(groups1, members1, lanes, rngs, size)
+        uniforms2 = _draw_uniforms(groups2, members2, lanes, rngs, size)
+        if noisy:
+            errors = _draw_errors(lanes, rngs, size, order1, noise, misperception)
+            flips1, flips2, misreads1, misreads2 = np.moveaxis(errors, 2, 0)
+
+        for r in range(size):
+            action1 = history1[r]
+            seen_by1 = last2
+            seen_by2 = last1
+            if misperception and start + r:
+                seen_by1 = last2 ^ misreads1[r]
+                seen_by2 = last1 ^ misreads2[r]
+            seen_by2 = seen_by2[to_side2]
+            cooperated2 = ~seen_by1 if start + r else nobody
+            cooperated1 = ~seen_by2 if start + r else nobody
+            # The moves really played last round (flips included), for
+            # kernels that follow their own moves
+            played2 = last2[to_side2] if own_moves2 else None
+            for ((choose, _, _, own), s), state, degree, u in zip(groups1, state1, degree1, uniforms1):
+                action1[s] = choose(state, cooperated2[s], seen_by1[s], degree, None if u is None else u[r],
+                                    *((last1[s],) if own else ()))
+            for ((choose, _, _, own), s), state, degree, u in zip(groups2, state2, degree2, uniforms2):
+                action2[s] = choose(state, cooperated1[s], seen_by2[s], degree, None if u is None else u[r],
+                                    *((played2[s],) if own else ()))
+            last1 = action1
+            last2 = np.take(action2, to_side1, out=history2[r])
+            if noise:
+                last1 ^= flips1[r]
+                last2 ^= flips2[r]
+
+        if recorder is not None:
+            recorder.record_block(side1_matches, start, history1[:size], history2[:size], payoff)
+        defects1 += history1[:size].sum(axis=0)
+        defects2 += history2[:size].sum(axis=0)
+        mutual_defects += (history1[:size] & history2[:size]).sum(axis=0)
+        last1 = last1.copy()
+        last2 = last2.copy()
+
+    # Rebuild per-lane scores from the outcome counts
+    score1, score2 = payoff.scores(*outcome_counts(rounds, defects1, defects2, mutual_defects))
+
+    lane_score1 = np.empty(n, dtype=score1.dtype)
+    lane_score2 = np.empty(n, dtype=score2.dtype)
+    lane_score1[order1] = score1
+    lane_score2[order1] = score2
+
+    # Each pairing's scores per replicate (a single lane for collapsed ones)
+    offsets = np.concatenate(([0], np.cumsum(lanes)))
+    return [(lane_score1[offsets[k]:offsets[k + 1]], lane_score2[offsets[k]:offsets[k + 1]])
+            for k in range(len(pairings))]
 
-    plt.figure(figsize=(10, 5))
-    plt.bar(labels, values, color=['green', 'blue', 'orange'])
-    plt.title(f'Simulation Results: {player1_class.__name__} vs {player2_class.__name__}')
-    plt.xlabel('Outcome')
-    plt.ylabel('Frequency')
+def _play_scores(pairings, rngs, rounds, simulations, payoff, recorder=None, noise=0.0, misperception=0.0):
+    # Per-replicate scores of every pairing: noiseless matches between
+    # machines (see machines.py) are all played in one pass of table
+    # lookups, other batchable pairings together in one pass of `rounds`
+    # array updates, and anything else goes through play_round. rngs[k] is
+    # pairing k's Generator; playing more replicates later continues its
+    # stream.
+    scores = [None] * len(pairings)
+    if not (noise or misperception) and recorder is None:
+        automata = [k for k, (p1, p2) in enumerate(pairings) if machines.is_machine(p1) and machines.is_machine(p2)]
+        if automata:
+            scores1, scores2 = machines.play([(pairings[k][0].machine, pairings[k][1].machine) for k in automata],
+                                             rounds, payoff)
+            for i, k in enumerate(automata):
+                scores[k] = (scores1[i:i + 1], scores2[i:i + 1])
+    batched = [k for k, (p1, p2) in enumerate(pairings)
+               if scores[k] is None and is_batchable(p1) and is_batchable(p2)]
+    if batched:
+        batch_scores = _batched_scores([pairings[k] for k in batched], rounds, simulations, payoff,
+                                       [rngs[k] for k in batched], recorder, noise, misperception)
+        for k, pairing_scores in zip(batched, batch_scores):
+            scores[k] = pairing_scores
 
-    # Save the plot as an image
-    plt.savefig(f'{player1_class.__name__}_vs_{player2_class.__name__}.png')
-    plt.close()
+    for k, (player1_class, player2_class) in enumerate(pairings):
+        if scores[k] is None:
+            scores[k] = _scalar_scores(player1_class, player2_class, rounds, simulations, payoff, rngs[k],
+                                       recorder, noise, misperception)
+    return scores
 
-def main():
+# Sequential sampling starts with this many replicates per pairing
+_FIRST_SAMPLE = 10
+
+class _Tally:
+    # Running sums of both players' scores and wins over the replicates so far
+
+    def __init__(self):
+        self.count = 0
+        self.sums = np.zeros(4)     # score1, score2, win1, win2
+        self.squares = np.zeros(4)
+        self.exact = False
+
+    def add(self, scores1, scores2):
+        values = np.array([scores1, scores2, scores1 > scores2, scores2 > scores1], dtype=np.float64)
+        self.count += values.shape[1]
+        self.sums += values.sum(axis=1)
+        self.squares += (values * values).sum(axis=1)
+
+    def half_widths(self, z):
+        # Normal-approximation confidence interval half-widths of the means
+        if self.exact or self.count < 2:
+            return np.zeros(4) if self.exact else np.full(4, np.inf)
+        mean = self.sums / self.count
+        variance = np.maximum(self.squares - self.count * mean * mean, 0) / (self.count - 1)
+        return z * np.sqrt(variance / self.count)
+
+    def precision(self, z, rounds):
+        # Widest interval, with the scores per round so one target fits both
+        return float(np.max(self.half_widths(z) / [rounds, rounds, 1, 1]))
+
+    def result(self, z, rounds):
+        mean = self.sums / self.count
+        low, high = mean - self.half_widths(z), mean + self.half_widths(z)
+        wins1, wins2 = (int(round(total)) for total in self.sums[2:])
+        return {
+            'player1_wins': wins1,
+            'player2_wins': wins2,
+            'draws': self.count - wins1 - wins2,
+            'player1_average_score': mean[0].item(),
+            'player2_average_score': mean[1].item(),
+            'simulations': self.count,
+            'precision': self.precision(z, rounds),
+            'player1_score_ci': (low[0].item(), high[0].item()),
+            'player2_score_ci': (low[1].item(), high[1].item()),
+            'player1_win_rate_ci': (max(low[2].item(), 0.0), min(high[2].item(), 1.0)),
+            'player2_win_rate_ci': (max(low[3].item(), 0.0), min(high[3].item(), 1.0))
+        }
+
+def _sequential_scores(pairings, rngs, rounds, simulations, payoff, noise, misperception, precision, z):
+    # Replicates are added to the pairings whose intervals are still wider
+    # than precision, at most `simulations` each. Intervals shrink as one
+    # over the square root of the replicates, so every pass plays as many
+    # as the widest of them projects it needs: a batched pass costs about
+    # the same for 10 replicates as for 100. Pairings that replay
+    # identically are exact after one replicate.
+    tallies = [_Tally() for _ in pairings]
+    active = list(range(len(pairings)))
+    played = 0
+    size = min(_FIRST_SAMPLE, simulations)
+    while active and size:
+        scores = _play_scores([pairings[k] for k in active], [rngs[k] for k in active], rounds, size, payoff,
+                              None, noise, misperception)
+        played += size
+        still_active = []
+        needed = 0
+        for k, (scores1, scores2) in zip(active, scores):
+            tallies[k].add(scores1, scores2)
+            tallies[k].exact = len(scores1) < size
+            achieved = tallies[k].precision(z, rounds)
+            if not tallies[k].exact and achieved > precision:
+                still_active.append(k)
+                needed = max(needed, np.ceil(1.1 * played * (achieved / precision) ** 2))
+        active = still_active
+        size = int(min(max(needed, played + _FIRST_SAMPLE), simulations)) - played
+    return [tally.result(z, rounds) for tally in tallies]
+
+def _exact_result(result, rounds):
+    # The sequential-sampling fields of a result that involves no sampling
+    result.update({
+        'precision': 0.0,
+        'player1_score_ci': (result['player1_average_score'],) * 2,
+        'player2_score_ci': (result['player2_average_score'],) * 2,
+        'player1_win_rate_ci': (result['player1_wins'] / result['simulations'],) * 2,
+        'player2_win_rate_ci': (result['player2_wins'] / result['simulations'],) * 2
+    })
+    return result
+
+def _simulate_pairings(pairings, seeds, rounds, simulations, payoff, method='auto', recorder=None,
+                       noise=0.0, misperception=0.0, precision=None, confidence=0.95):
+    # Memory-one pairings are solved as Markov chains where `method` allows;
+    # the rest are played (see _play_scores), `simulations` replicates each
+    # or, with a precision, sequentially until their confidence intervals
+    # are that narrow. A recorder needs the rounds, so nothing is solved
+    # while recording.
+    results = [None] * len(pairings)
+    noisy = noise or misperception
+    for k, (p1, p2) in enumerate(pairings):
+        if recorder is None and _solvable(p1, p2, method, noisy):
+            vector1, vector2 = declared_memory_one(p1), declared_memory_one(p2)
+            if precision is None:
+                results[k] = _solved_simulation(vector1, vector2, rounds, simulations, payoff)
+            else:
+                # A deterministic pair is decided by its one possible match
+                count = 1 if is_deterministic(vector1) and is_deterministic(vector2) else simulations
+                results[k] = _solved_simulation(vector1, vector2, rounds, count, payoff)
+                results[k]['simulations'] = count
+                _exact_result(results[k], rounds)
+    played = [k for k in range(len(pairings)) if results[k] is None]
+    if not played:
+        return results
+
+    played_pairings = [pairings[k] for k in played]
+    rngs = [make_rng(seeds[k]) for k in played]
+    if precision is None:
+        scores = _play_scores(played_pairings, rngs, rounds, simulations, payoff, recorder, noise, misperception)
+        played_results = [_summary(scores1, scores2, simulations) for scores1, scores2 in scores]
+    else:
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        played_results = _sequential_scores(played_pairings, rngs, rounds, simulations, payoff, noise,
+                                            misperception, precision, z)
+    for k, result in zip(played, played_results):
+        results[k] = result
+    return results
+
+def _cached_pairings(pairings, seeds, rounds, simulations, payoff, method, seed, cache, compute,
+                     noise=0.0, misperception=0.0, precision=None, confidence=0.95):
+    # Look every pairing up in the cache and compute only the missing ones.
+    # Stochastic pairings (and all noisy ones) are only reproducible, and
+    # so cached, for a seed.
+    if cache is None:
+        return compute(pairings, seeds)
+    noisy = bool(noise or misperception)
+    extra = ((simulations, method) + ((precision, confidence) if precision is not None else ())
+             + ((noise, misperception) if noisy else ()))
+    keys = [match_key(p1, p2, rounds, payoff, seeds[k] if seed is not None else None, *extra, stochastic=noisy)
+            for k, (p1, p2) in enumerate(pairings)]
+    results = [None if key is None else cache.get(key) for key in keys]
+    missing = [k for k, result in enumerate(results) if result is None]
+    if missing:
+        computed = compute([pairings[k] for k in missing], [seeds[k] for k in missing])
+        for k, result in zip(missing, computed):
+            results[k] = result
+            if keys[k] is not None:
+                cache.put(keys[k], dict(result))
+        cache.flush()
+    return [dict(result) for result in results]
+
+def _check_sampling(precision, confidence, recorder):
+    if precision is None:
+        return
+    if not precision > 0:
+        raise ValueError(f"precision must be positive, got {precision!r}")
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must be between 0 and 1, got {confidence!r}")
+    if recorder is not None:
+        raise ValueError("Recording rounds needs a fixed number of simulations (precision=None)")
+
+def run_simulations(pairings, rounds=1000, simulations=100, payoff=PAYOFF, seed=None, method='auto',
+                    cache=None, recorder=None, noise=0.0, misperception=0.0, precision=None, confidence=0.95):
+    # seed may be None, an int, a SeedSequence or a Generator. Pairing k
+    # always plays with child k of it, whatever else is in the batch.
+    #
+    # method picks the memory-one fast path: 'auto' solves pairs of
+    # deterministic memory-one strategies exactly, 'exact' also replaces
+    # stochastic memory-one pairs by their expected results, and
+    # 'simulate' always plays the rounds.
+    #
+    # With a MatchCache, results of deterministic pairings (and of every
+    # pairing when seed is not None) are reused instead of recomputed.
+    # A MatchRecorder receives every round played; recording bypasses the
+    # cache and the memory-one shortcut.
+    #
+    # noise is the probability that a move is flipped as it is played and
+    # misperception the probability that a player sees its opponent's last
+    # move flipped (see noise.py). Noisy pairings are always simulated, with
+    # every replicate played out.
+    #
+    # With a precision, simulations becomes a budget: replicates are added
+    # until the `confidence` intervals of both players' mean score per
+    # round and of both win rates are at most precision wide on each side.
+    # Results then also hold the replicates played ('simulations'), the
+    # widest half-width reached ('precision') and the intervals
+    # ('player1_score_ci', 'player1_win_rate_ci' and the player 2 ones, the
+    # score ones for the average score per match). Pairings that replay
+    # identically stop after one replicate.
+    if method not in ('auto', 'exact', 'simulate'):
+        raise ValueError(f"Unknown method {method!r}, expected 'auto', 'exact' or 'simulate'")
+    trembling.check(noise, misperception)
+    _check_sampling(precision, confidence, recorder)
+    pairings = list(pairings)
+    seeds = spawn(seed, len(pairings))
+    if recorder is not None:
+        cache = None
+    return _cached_pairings(pairings, seeds, rounds, simulations, payoff, method, seed, cache,
+                            lambda pairings, seeds: _simulate_pairings(pairings, seeds, rounds, simulations,
+                                                                       payoff, method, recorder, noise,
+                                                                       misperception, precision, confidence),
+                            noise, misperception, precision, confidence)
+
+def run_simulation(player1_class, player2_class, rounds=1000, simulations=100, payoff=PAYOFF, seed=None,
+                   method='auto', cache=None, recorder=None, noise=0.0, misperception=0.0, precision=None,
+                   confidence=0.95):
+    return run_simulations([(player1_class, player2_class)], rounds, simulations, payoff, seed, method,
+                           cache, recorder, noise, misperception, precision, confidence)[0]
+
+def _sweep_task(task):
+    pairings, seeds, rounds, simulations, payoff, method, noise, misperception, precision, confidence = task
+    return _simulate_pairings(pairings, seeds, rounds, simulations, payoff, method, None, noise, misperception,
+                              precision, confidence)
+
+def run_sweep(player_classes, rounds=1000, simulations=100, payoff=PAYOFF, seed=None,
+              workers=1, chunksize=None, method='auto', cache=None, recorder=None, noise=0.0, misperception=0.0,
+              precision=None, confidence=0.95, checkpoint=None, reporter=None):
+    # Plays every ordered pairing of player_classes, fanning chunks of
+    # pairings out to a process pool when workers != 1 (None means one per
+    # CPU). Seeds are spawned exactly as in run_simulations, so the results
+    # are identical for any worker count or chunk size. Cached pairings
+    # are served in this process and never sent to the pool. Recording
+    # (see run_simulations) needs workers=1; noise and sequential sampling
+    # (precision) work as there.
+    #
+    # With a Checkpoint (see checkpoint.py) the pairings are played
+    # checkpoint.every at a time and each result is logged; rerunning with
+    # the same log resumes, replaying the logged results, and gives the
+    # results of an uninterrupted sweep.
+    #
+    # Results go to reporter (see reporting.py) as 'sweep_start', one
+    # 'pairing' event per pairing in order, and 'sweep_end'. While it
+    # listens the pairings are played a row of the sweep at a time, so
+    # progress shows as they finish rather than all at the end.
+    if recorder is not None and workers != 1:
+        raise ValueError("Recording rounds needs workers=1")
+    trembling.check(noise, misperception)
+    _check_sampling(precision, confidence, recorder)
+    pairings = [(player1_class, player2_class)
+                for player1_class in player_classes
+                for player2_class in player_classes]
+    records = []
+    if checkpoint is not None:
+        run = {'run': 'sweep', 'players': [player_class.__name__ for player_class in player_classes],
+               'rounds': rounds, 'simulations': simulations, 'payoff': payoff.values, 'method': method,
+               'noise': noise, 'misperception': misperception, 'precision': precision, 'confidence': confidence}
+        # The log keeps the root seed, so an unseeded sweep resumes with
+        # the same seeds; cache keys still follow the seed given here
+        root, records = checkpoint.start(run, seed)
+        seeds = spawn(root, len(pairings))
+    else:
+        seeds = spawn(seed, len(pairings))
+    if recorder is not None:
+        cache = None
+
+    if reporter is None:
+        reporter = Reporter()
+    results = [None] * len(pairings)
+    for k, result in records:
+        results[k] = result
+    pending = [k for k, result in enumerate(results) if result is None]
+    if checkpoint is not None:
+        batch_size = checkpoint.every
+    elif reporter.listening:
+        batch_size = len(player_classes)
+    else:
+        batch_size = max(len(pending), 1)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers != 1 and pending else None
+
+    def compute(pairings, seeds):
+        if executor is None:
+            return _simulate_pairings(pairings, seeds, rounds, simulations, payoff, method, recorder, noise,
+                                      misperception, precision, confidence)
+        size = chunksize
+        if size is None:
+            size = -(-len(pairings) // (workers or os.cpu_count() or 1))
+        tasks = [(pairings[k:k + size], seeds[k:k + size], rounds, simulations, payoff, method, noise,
+                  misperception, precision, confidence)
+                 for k in range(0, len(pairings), size)]
+        return [result for chunk in executor.map(_sweep_task, tasks) for result in chunk]
+
+    reported = 0
+
+    def report():
+        # Emit every finished pairing not reported yet, stopping at the
+        # first one still being played
+        nonlocal reported
+        while reported < len(pairings) and results[reported] is not None:
+            player1_class, player2_class = pairings[reported]
+            reporter.emit('pairing', player1=player1_class.__name__, player2=player2_class.__name__,
+                          results=results[reported])
+            reported += 1
+
+    if reporter.listening:
+        reporter.emit('sweep_start', total=len(pairings))
+        report()
+    try:
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            computed = _cached_pairings([pairings[k] for k in batch], [seeds[k] for k in batch], rounds,
+                                        simulations, payoff, method, seed, cache, compute, noise, misperception,
+                                        precision, confidence)
+            for k, result in zip(batch, computed):
+                results[k] = result
+                if checkpoint is not None:
+                    checkpoint.append((k, result))
+            if reporter.listening:
+                report()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    if checkpoint is not None:
+        checkpoint.write()
+    if reporter.listening:
+        reporter.emit('sweep_end')
+        reporter.flush()
+    return [(player1_class, player2_class, result)
+            for (player1_class, player2_class), result in zip(pairings, results)]
+
+def plot_results(results, player1_class, player2_class):
+    # Plotting lives in plotting.py so the engine never loads matplotlib
+    import plotting
+    plotting.plot_results(results, player1_class, player2_class)
+
+def render_plots(sweep):
+    # Optional post-processing stage: one PNG per pairing of a run_sweep result
+    for player1_class, player2_class, results in sweep:
+        plot_results(results, player1_class, player2_class)
+
+def main(reporter=None, argv=None):
     player_classes = [
         TitForTatPlayer, RandomPlayer, GrimTriggerPlayer, 
-        ForgivingTitForTatPlayer, RuthlessTitForTatPlayer, 
-        SuperForgivingPlayer, SuperUnForgivingPlayer
+        GenerousTitForTatPlayer, RuthlessTitForTatPlayer, 
+        SuperForgivingPlayer, SuperUnforgivingPlayer
     ]
 
-    for player1_class in player_classes:
-        for player2_class in player_classes:
-            results = run_simulation(player1_class, player2_class)
-            print(f"{player1_class.__name__} vs {player2_class.__name__}:")
-            print(f"Player 1 wins: {results['player1_wins']}, Player 2 wins: {results['player2_wins']}, Draws: {results['draws']}")
-            print(f"Player 1 average score: {results['player1_average_score']}, Player 2 average score: {results['player2_average_score']}\n")
+    parser = argparse.ArgumentParser(description="Play every pairing of the built-in strategies and plot them")
+    # --quiet, --progress and --jsonl pick the reporter (see reporting.py)
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--quiet', action='store_true', help="report nothing")
+    output.add_argument('--progress', action='store_true', help="show a progress bar")
+    output.add_argument('--jsonl', action='store_true', help="report JSON lines")
+    parser.add_argument('--precision', type=float, default=None,
+                        help="sample each pairing only until its intervals are this wide")
+    parser.add_argument('--checkpoint', metavar='PATH', default=None,
+                        help="log finished pairings to PATH and resume from it")
+    parser.add_argument('--no-plots', action='store_true', help="skip the PNG plots")
+    args = parser.parse_args(argv)
+    if reporter is None:
+        if args.quiet:
+            reporter = Reporter()
+        elif args.progress:
+            reporter = ProgressReporter()
+        elif args.jsonl:
+            reporter = JSONLinesReporter()
+        else:
+            reporter = TextReporter()
+
+    with reporter:
+        if args.checkpoint is not None:
+            with Checkpoint(args.checkpoint) as checkpoint:
+                sweep = run_sweep(player_classes, precision=args.precision, checkpoint=checkpoint,
+                                  reporter=reporter)
+        else:
+            sweep = run_sweep(player_classes, precision=args.precision, reporter=reporter)
 
-            # Plot the results for each combination and save the image
-            plot_results(results, player1_class, player2_class)
+    # Plot the results for each combination and save the images
+    if not args.no_plots:
+        render_plots(sweep)
 
 if __name__ == "__main__":
     main()
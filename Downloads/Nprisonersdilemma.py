@@ -1,167 +1,166 @@
-import random
-import matplotlib.pyplot as plt
 import numpy as np
-class Player:
-    def __init__(self,opponent):
-        self.opponent = opponent
-        self.last_action = None
-    def update_score(self, reward):
-        self.score += reward
-
-class TitForTatPlayer(Player):
-    def __init__(self):
-        super().__init__()
-    def choose_action(self, opponents):
-        for opponent in opponents:
-            if opponent.last_action == 'defect':
-                return "defect" 
-        return 'cooperate'
-
-class TitForTatPlayeMixed(Player):
-    def __init__(self):
-        super().__init__()
-    def choose_action(self, opponents):
-        n_defect = 0
-        n_cooperate = 0
-        for opponent in opponents:
-            if opponent.last_action == 'defect':
-                n_defect+=1
-            else:
-                n_cooperate+=1
-        if n_cooperate >= n_defect:
-            return "cooperate"
-        else:
-            return "defect"
-
-class RandomPlayer(Player):
-    def __init__(self):
-        super().__init__()
-    def choose_action(self, opponent):
-        return random.choice(["cooperate", "defect"])
-    
-class GrimTriggerPlayer(Player):
-    def __init__(self):
-        super().__init__()
-        self.triggered = False
-    def choose_action(self,opponents):
-        for opponent in opponents:
-            if opponent.last_action == 'cooperate' and self.triggeres is False:
-                self.triggered = False       
-            else:
-                self.triggered = True
-                return 'defect'
-        return 'cooperate'
-class GrimTriggerMixPlayer(Player):
-    def __init__(self):
-        super().__init__()
-        self.triggered = False
-    def choose_action(self,opponents):
-        counter = 0
-        limit = 3
-        for opponent in opponents:
-            if counter < limit:
-                if opponent.last_action == 'cooperate' and self.triggeres is False:
-                    self.triggered = False       
-                elif not(opponent.last_action == 'cooperate' and self.triggeres is False):
-                    self.triggered = True
-                    counter =+ 1
-            else:
-                return 'defect'
-        return 'cooperate'
-
-class ForgivingTitForTatPlayer(Player):
-    def __init__(self):
-        super().__init__()
-    def choose_action(self, opponents):
-        n = len(opponent)
-        m = 0
-        for opponent in opponents:
-            if m > n/5:
-                return "cooperate"
-            elif opponent.last_action == 'cooperate':
-                m =+1
-        return random.choice(["cooperate", "defect"])
-class RuthlessTitForTatPlayer(Player):
-    def __init__(self):
-        super().__init__()
-    def choose_action(self, opponents):
-        n = len(opponent)
-        m = 0
-        for opponent in opponents:
-            if m > n/5:
-                return "defect"
-            elif opponent.last_action == 'cooperate':
-                m =+ 1    
-        return random.choice(["cooperate", "defect"])
-class SuperForgivingPlayer:
-    def __init__(self):
-        super().__init__()
-    def choose_action(self, opponents):
-        return "cooperate"
-class SuperUnForgivingPlayer:
-    def __init__(self):
-        super().__init__()
-    def choose_action(self, opponents):
-        return "defect"
-
-def play_round(players):
-    for i, player1 in enumerate(players):
-        for j, player2 in enumerate(players):
-            if i != j:  # Avoid playing against oneself
-                action1 = player1.choose_action(player2)
-                action2 = player2.choose_action(player1)
-
-                if action1 == 'cooperate' and action2 == 'cooperate':
-                    reward1 = 2
-                    reward2 = 2
-                elif action1 == 'cooperate' and action2 == 'defect':
-                    reward1 = -1
-                    reward2 = 3
-                elif action1 == 'defect' and action2 == 'cooperate':
-                    reward1 = 3
-                    reward2 = -1
-                else:  # Both defect
-                    reward1 = 0
-                    reward2 = 0
-
-                player1.update_score(reward1)
-                player2.update_score(reward2)
-
-def run_simulation(players, rounds):
+from actions import COOPERATE, DEFECT
+from payoff import PayoffMatrix
+from randomness import make_rng
+import noise as trembling
+from strategies import (TitForTatPlayer, RandomPlayer, GrimTriggerPlayer, ForgivingTitForTatPlayer,
+                        RuthlessTitForTatPlayer, SuperForgivingPlayer, SuperUnforgivingPlayer, has_kernel)
+from topology import Topology
+
+# Payoffs used by this simulation: R=2, S=-1, T=3, P=0
+PAYOFF = PayoffMatrix(reward=2, sucker=-1, temptation=3, punishment=0)
+
+# Every player decides once per round from its opponents' actions in the
+# previous round; NPlayerGame runs the strategies' population kernels
+# (see strategies.py).
+
+def play_round(players, payoff=PAYOFF, topology=None):
+    # Everyone decides from last round's actions before anything is updated.
+    # Without a topology every player meets every other player once.
+    if topology is None:
+        actions = [player.choose_action(players[:i] + players[i + 1:])
+                   for i, player in enumerate(players)]
+    else:
+        actions = [player.choose_action([players[j] for j in topology.neighbours(i)])
+                   for i, player in enumerate(players)]
+
+    # A player's reward only depends on how many opponents cooperated or defected
+    defecting = np.array([action == DEFECT for action in actions], dtype=np.float64)
+    if topology is None:
+        defectors = defecting.sum() - defecting
+        cooperators = len(players) - 1 - defectors
+    else:
+        defectors = topology.neighbour_sum(defecting)
+        cooperators = topology.degree - defectors
+    for player, action, n_cooperate, n_defect in zip(players, actions, cooperators.tolist(), defectors.tolist()):
+        player.update_score(payoff.matrix[action, COOPERATE].item() * n_cooperate
+                            + payoff.matrix[action, DEFECT].item() * n_defect)
+        player.last_action = action
+
+def run_simulation(players, rounds, payoff=PAYOFF, topology=None):
     for _ in range(rounds):
-        play_round(players)
+        play_round(players, payoff, topology)
 
-def plot_scores(players):
-    names = [type(player).__name__ for player in players]
-    scores = [player.score for player in players]
+class NPlayerGame:
+    """Simultaneous N-player game with the whole population stored as arrays
 
-    plt.bar(names, scores)
-    plt.xlabel('Players')
-    plt.ylabel('Scores')
-    plt.title('Prisoner\'s Dilemma Simulation')
-    plt.show()
+    population lists one strategy class per agent. interaction is either a
+    Topology (ring, lattice, small-world, scale-free or an edge list) or a
+    dense N x N weight matrix (interaction[i, j] is how much i plays
+    against j); by default everyone plays everyone else once.
 
-def plot_average_scores(player_classes, num_simulations):
+    noise is the probability that an agent's move is flipped as it is
+    played, misperception the probability that it sees any one
+    neighbour's last move flipped (see noise.py). Both are drawn as one
+    mask or binomial draw over the whole population per round;
+    misperception needs unweighted interactions, since it counts
+    neighbours."""
+
+    def __init__(self, population, payoff=PAYOFF, interaction=None, seed=None, noise=0.0, misperception=0.0):
+        self.classes = list(population)
+        self.payoff = payoff
+        self.rng = make_rng(seed)
+        trembling.check(noise, misperception)
+        self.noise = noise
+        self.misperception = misperception
+        n = len(self.classes)
+
+        if interaction is None:
+            self.topology = None
+            self.degree = np.full(n, n - 1, dtype=np.float64)
+        else:
+            if not isinstance(interaction, Topology):
+                interaction = Topology.from_matrix(interaction)
+            if interaction.n != n:
+                raise ValueError(f"interaction has {interaction.n} agents, population has {n}")
+            if misperception and interaction.weights is not None:
+                raise ValueError("misperception needs an unweighted interaction")
+            self.topology = interaction
+            self.degree = interaction.degree
+
+        # One group of agent indices per strategy class
+        self.groups = []
+        for cls in dict.fromkeys(self.classes):
+            if not has_kernel(cls):
+                raise ValueError(f"{cls.__name__} has no population kernel; play it with run_simulation")
+            index = np.flatnonzero([c is cls for c in self.classes])
+            self.groups.append((cls, index, self.degree[index], cls.init_batch_state(len(index))))
+
+        self.actions = np.zeros(n, dtype=bool)  # True = DEFECT
+        self.scores = np.zeros(n)
+        self.defectors = np.zeros(n)  # Defecting neighbours in the last round
+        self.rounds_played = 0
+
+    @classmethod
+    def from_counts(cls, counts, **kwargs):
+        """Build a game from {strategy class: number of agents}"""
+        return cls([player_class for player_class, count in counts.items() for _ in range(count)], **kwargs)
+
+    def neighbour_defectors(self, actions):
+        if self.topology is None:
+            return np.count_nonzero(actions) - actions
+        return self.topology.neighbour_sum(actions)
+
+    def play_round(self):
+        if self.rounds_played:
+            defectors = self.defectors
+            cooperators = self.degree - defectors
+            if self.misperception:
+                # Each neighbour's move is misread independently
+                defectors = (self.rng.binomial(defectors.astype(np.int64), 1 - self.misperception)
+                             + self.rng.binomial(cooperators.astype(np.int64), self.misperception))
+                cooperators = self.degree - defectors
+        else:
+            defectors = cooperators = np.zeros(len(self.classes))
+
+        actions = np.empty(len(self.classes), dtype=bool)
+        for cls, index, degree, state in self.groups:
+            uniforms = self.rng.random(len(index)) if cls.batch_random else None
+            own = (self.actions[index],) if cls.batch_own_moves else ()
+            actions[index] = cls.choose_batch(state, cooperators[index], defectors[index], degree, uniforms, *own)
+        if self.noise:
+            actions ^= self.rng.random(len(actions)) < self.noise
+
+        # Reward = M[a, C] * cooperating neighbours + M[a, D] * defecting neighbours
+        defectors = self.neighbour_defectors(actions)
+        cooperators = self.degree - defectors
+        matrix = self.payoff.matrix
+        self.scores += np.where(actions,
+                                matrix[DEFECT, COOPERATE] * cooperators + matrix[DEFECT, DEFECT] * defectors,
+                                matrix[COOPERATE, COOPERATE] * cooperators + matrix[COOPERATE, DEFECT] * defectors)
+        self.actions = actions
+        self.defectors = defectors
+        self.rounds_played += 1
+
+    def run(self, rounds):
+        for _ in range(rounds):
+            self.play_round()
+        return self.scores
+
+    def average_scores(self):
+        """Mean score of each strategy class present"""
+        return {cls.__name__: float(self.scores[index].mean()) for cls, index, _, _ in self.groups}
+
+def plot_scores(players):
+    import plotting
+    plotting.plot_scores(players)
+
+def average_score_history(player_classes, num_simulations):
+    """{class name: [average score in each simulation]} of two-player games of each class"""
     average_scores = {player_class.__name__: [] for player_class in player_classes}
 
     for _ in range(num_simulations):
         for player_class in player_classes:
-            players = [player_class() for _ in range(2)]  # Create two players of the same class
-            run_simulation(players, rounds=100)  # Adjust the number of rounds as needed
-            scores = [player.score for player in players]
+            game = NPlayerGame([player_class] * 2)  # Two players of the same class
+            scores = game.run(rounds=100)  # Adjust the number of rounds as needed
             average_score = np.mean(scores)
             average_scores[player_class.__name__].append(average_score)
+    return average_scores
 
-    plt.figure(figsize=(10, 6))
-    for player_class, scores in average_scores.items():
-        plt.plot(scores, label=player_class)
-
-    plt.xlabel('Simulation')
-    plt.ylabel('Average Score')
-    plt.title('Average Scores of Player Types over Simulations')
-    plt.legend()
-    plt.show()
+def plot_average_scores(player_classes, num_simulations):
+    import plotting
+    plotting.plot_average_scores(average_score_history(player_classes, num_simulations))
 
 if __name__ == "__main__":
-    player_classes = [TitForTatPlayer, RandomPlayer, GrimTriggerPlayer, ForgivingTitForTatPlayer, RuthlessTitForTatPlayer, SuperForgivingPlayer, SuperUnForgivingPlayer]
+    player_classes = [TitForTatPlayer, RandomPlayer, GrimTriggerPlayer, ForgivingTitForTatPlayer, RuthlessTitForTatPlayer, SuperForgivingPlayer, SuperUnforgivingPlayer]
     plot_average_scores(player_classes, num_simulations=10)
@@ -0,0 +1,27 @@
+from enum import IntEnum
+
+class Action(IntEnum):
+    """Integer action codes shared by every engine; they index payoff tables directly"""
+    COOPERATE = 0
+    DEFECT = 1
+
+    # The string form only appears when printing or reading human input
+    def __str__(self):
+        return self.name.lower()
+
+    def __format__(self, format_spec):
+        return format(str(self), format_spec)
+
+COOPERATE = Action.COOPERATE
+DEFECT = Action.DEFECT
+
+ACTIONS = (COOPERATE, DEFECT)
+
+_ACTION_NAMES = {
+    'c': COOPERATE, 'cooperate': COOPERATE,
+    'd': DEFECT, 'defect': DEFECT,
+}
+
+def parse_action(text):
+    """Return the Action named by text ('c'/'cooperate' or 'd'/'defect'), or None"""
+    return _ACTION_NAMES.get(text.lower().strip())
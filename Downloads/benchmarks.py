@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""Benchmarks for every engine, written as JSON for comparing commits
+
+    python benchmarks.py [--quick] [--output FILE] [--compare BASELINE]
+                         [--only NAME ...]
+
+Each case is timed `repeat` times (best and median are kept) and run once
+more under tracemalloc for its peak memory. --compare prints the ratio
+of every median to the one in BASELINE and exits with status 1 when any
+case got slower than --threshold (default 1.25)."""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+class Case:
+    """One benchmark: name, parameters, a zero-argument callable and how much work it does
+
+    work is the number of units (rounds, matches, agent-rounds) one call
+    processes, so results also come out as units per second."""
+
+    def __init__(self, name, params, run, work=None, unit=None):
+        self.name = name
+        self.params = params
+        self.run = run
+        self.work = work
+        self.unit = unit
+
+def games_cases(quick):
+    import Games
+    import strategies
+
+    classes = [strategies.TitForTatPlayer, strategies.RandomPlayer, strategies.GrimTriggerPlayer,
+               strategies.GenerousTitForTatPlayer, strategies.SuperUnforgivingPlayer]
+    rounds, simulations = (200, 20) if quick else (1000, 100)
+    for method in ('simulate', 'auto'):
+        for player1_class in classes:
+            for player2_class in classes:
+                yield Case('games.run_simulation',
+                           {'pair': f"{player1_class.__name__}-{player2_class.__name__}", 'method': method,
+                            'rounds': rounds, 'simulations': simulations},
+                           lambda p1=player1_class, p2=player2_class, m=method: Games.run_simulation(
+                               p1, p2, rounds, simulations, seed=0, method=m),
+                           rounds * simulations, 'rounds')
+    yield Case('games.run_simulation',
+               {'pair': 'TitForTatPlayer-GrimTriggerPlayer', 'noise': 0.01, 'misperception': 0.01,
+                'rounds': rounds, 'simulations': simulations},
+               lambda: Games.run_simulation(strategies.TitForTatPlayer, strategies.GrimTriggerPlayer, rounds, simulations,
+                                            seed=0, noise=0.01, misperception=0.01),
+               rounds * simulations, 'rounds')
+    yield Case('games.run_sweep', {'strategies': len(classes), 'rounds': rounds, 'simulations': simulations},
+               lambda: Games.run_sweep(classes, rounds, simulations, seed=0),
+               len(classes) ** 2 * rounds * simulations, 'rounds')
+    yield Case('games.run_sweep', {'strategies': len(classes), 'rounds': rounds, 'simulations': simulations,
+                                   'precision': 0.01},
+               lambda: Games.run_sweep(classes, rounds, simulations, seed=0, precision=0.01))
+
+def tournament_cases(quick):
+    import strategies
+    import tournament_dilemma
+    from reporting import Reporter
+
+    classes = [strategies.TitForTatPlayer, strategies.TitForTatMixedPlayer, strategies.RandomPlayer,
+               strategies.GrimTriggerPlayer, strategies.GrimTriggerMixPlayer, strategies.ForgivingTitForTatPlayer,
+               strategies.RuthlessTitForTatPlayer, strategies.SuperForgivingPlayer,
+               strategies.SuperUnforgivingPlayer]
+    matches = 2 if quick else 5
+    for n in ((3, 9) if quick else range(2, len(classes) + 1)):
+        yield Case('tournament.run_tournament', {'strategies': n, 'matches_per_pair': matches},
+                   lambda n=n: tournament_dilemma.run_tournament(classes[:n], matches_per_pair=matches, seed=0,
+                                                                 reporter=Reporter()),
+                   n * (n - 1) // 2 * matches, 'matches')
+
+def nplayer_cases(quick):
+    import Nprisonersdilemma as npd
+    import strategies
+
+    classes = [strategies.TitForTatPlayer, strategies.TitForTatMixedPlayer, strategies.RandomPlayer,
+               strategies.GrimTriggerPlayer, strategies.GrimTriggerMixPlayer, strategies.ForgivingTitForTatPlayer,
+               strategies.RuthlessTitForTatPlayer, strategies.SuperForgivingPlayer,
+               strategies.SuperUnforgivingPlayer]
+    rounds = 5 if quick else 20
+
+    def population(n):
+        return [classes[k % len(classes)] for k in range(n)]
+
+    for n in ((10, 100) if quick else (10, 30, 100, 300)):
+        def run(n=n):
+            players = [cls(rng=k) for k, cls in enumerate(population(n))]
+            npd.run_simulation(players, rounds)
+        yield Case('nplayer.play_round', {'population': n, 'rounds': rounds}, run, n * rounds, 'agent-rounds')
+
+    for n in ((100, 10_000) if quick else (100, 1_000, 10_000, 100_000)):
+        def run(n=n):
+            npd.NPlayerGame(population(n), seed=0).run(rounds)
+        yield Case('nplayer.NPlayerGame', {'population': n, 'rounds': rounds}, run, n * rounds, 'agent-rounds')
+
+        def run_ring(n=n):
+            from topology import Topology
+            npd.NPlayerGame(population(n), interaction=Topology.ring(n, 4), seed=0).run(rounds)
+        yield Case('nplayer.NPlayerGame', {'population': n, 'rounds': rounds, 'topology': 'ring4'},
+                   run_ring, n * rounds, 'agent-rounds')
+
+def machine_cases(quick):
+    import numpy as np
+    import Games
+    import machines
+
+    rng = np.random.default_rng(0)
+    classes = [machines.machine_player(f"LookupTable{k}", machines.lookup_table(rng.integers(0, 2, 16), 2))
+               for k in range(10 if quick else 30)]
+    rounds = 200 if quick else 1000
+    yield Case('machines.run_sweep', {'strategies': len(classes), 'rounds': rounds},
+               lambda: Games.run_sweep(classes, rounds, 100, method='simulate'),
+               len(classes) ** 2 * rounds, 'rounds')
+
+    import genetic
+    import strategies
+
+    opponents = [strategies.lookup(name) for name in sorted(strategies.STRATEGIES)]
+    population, generations = (20, 5) if quick else (50, 20)
+    for representation in genetic.REPRESENTATIONS:
+        yield Case('genetic.search', {'representation': representation, 'population': population,
+                                      'generations': generations},
+                   lambda representation=representation: genetic.search(
+                       opponents, representation, memory=2, population=population,
+                       generations=generations, seed=0),
+                   generations, 'generations')
+
+def equilibria_cases(quick):
+    import numpy as np
+    import equilibria
+
+    for n in ((50, 200) if quick else (50, 200, 500)):
+        # A general-sum meta-game with random payoffs
+        A = np.random.default_rng(n).normal(size=(n, n))
+        for method in ('auto', 'lemke_howson', 'fictitious_play'):
+            yield Case('equilibria.solve', {'strategies': n, 'method': method},
+                       lambda A=A, method=method: equilibria.solve(A, method))
+
+SUITES = {
+    'games': games_cases,
+    'tournament': tournament_cases,
+    'nplayer': nplayer_cases,
+    'machines': machine_cases,
+    'equilibria': equilibria_cases,
+}
+
+def time_case(case, repeat):
+    case.run()  # Warm up caches and lazy imports
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.run()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    case.run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    median = statistics.median(times)
+    result = {'name': case.name, 'params': case.params, 'times': times, 'best': min(times),
+              'median': median, 'peak_bytes': peak}
+    if case.work:
+        result['rate'] = case.work / median
+        result['unit'] = f"{case.unit}/s"
+    return result
+
+def import_times(modules, repeat):
+    """Median seconds to import each module in a fresh interpreter, minus interpreter start-up"""
+    def run(code):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], cwd=HERE, check=True)
+            times.append(time.perf_counter() - start)
+        return statistics.median(times)
+
+    baseline = run('pass')
+    return [{'name': 'import', 'params': {'module': module}, 'median': run(f'import {module}') - baseline}
+            for module in modules]
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=HERE, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    import numpy
+    return {'commit': commit, 'python': platform.python_version(), 'numpy': numpy.__version__,
+            'machine': platform.machine(), 'processor': platform.processor(), 'cpus': os.cpu_count(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+def case_key(result):
+    return result['name'] + ''.join(f" {k}={v}" for k, v in sorted(result['params'].items()))
+
+def compare(results, baseline, threshold):
+    """Print median ratios against a baseline; return the keys that got slower than threshold"""
+    previous = {case_key(result): result for result in baseline['benchmarks']}
+    slower = []
+    for result in results:
+        key = case_key(result)
+        if key not in previous:
+            continue
+        ratio = result['median'] / previous[key]['median'] if previous[key]['median'] > 0 else float('inf')
+        flag = ' SLOWER' if ratio > threshold else ''
+        print(f"{ratio:7.2f}x  {key}{flag}")
+        if flag:
+            slower.append(key)
+    return slower
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='smaller cases and fewer repeats')
+    parser.add_argument('--output', default='bench_output.json')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON from an earlier run')
+    parser.add_argument('--threshold', type=float, default=1.25)
+    parser.add_argument('--only', nargs='*', choices=sorted(SUITES) + ['import'])
+    parser.add_argument('--repeat', type=int)
+    args = parser.parse_args(argv)
+
+    repeat = args.repeat or (3 if args.quick else 5)
+    suites = args.only or sorted(SUITES) + ['import']
+    sys.path.insert(0, HERE)
+
+    results = []
+    for suite in suites:
+        if suite == 'import':
+            results.extend(import_times(['Games', 'tournament_dilemma', 'Nprisonersdilemma'], repeat))
+            continue
+        for case in SUITES[suite](args.quick):
+            result = time_case(case, repeat)
+            results.append(result)
+            rate = f"  {result['rate']:.3g} {result['unit']}" if 'rate' in result else ''
+            print(f"{result['median'] * 1e3:10.2f} ms{rate}  peak {result['peak_bytes'] / 2**20:.1f} MiB  "
+                  f"{case_key(result)}", flush=True)
+
+    for result in results:
+        if result['name'] == 'import':
+            print(f"{result['median'] * 1e3:10.2f} ms  {case_key(result)}")
+
+    report = {'meta': metadata(), 'benchmarks': results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import os
+import pickle
+import struct
+import time
+import zlib
+
+import numpy as np
+
+# Resumable runs. A checkpoint is an append-only log file: a header frame
+# describing the run (and its root seed), then frames of records of
+# completed work. A frame is length-prefixed and checksummed and goes to
+# disk with one write and an fsync, so a checkpoint is either complete or
+# missing; a frame cut short by a crash is dropped (and truncated away)
+# when the log is reopened. Writing a checkpoint costs one append of the
+# records since the last one, never a rewrite of the whole state.
+#
+# run_tournament logs (pairing, match, score, score1, score2) per match and
+# Games.run_sweep (pairing, results) per pairing. Reopening the log with
+# the same run skips the logged work and replays its records in order
+# (ELO ratings, results, reporter events), and every seed is derived from
+# the logged root seed, so a resumed run gives exactly the results of an
+# uninterrupted one.
+
+_MAGIC = b'PDCHECKPOINT1\n'
+_FRAME = struct.Struct('<II')  # payload length, crc32 of the payload
+
+def root_seed(seed):
+    """seed (None, an int, a SeedSequence or a Generator) as a SeedSequence
+    spawning the same children, with fresh entropy for None"""
+    if isinstance(seed, np.random.Generator):
+        seed = seed.bit_generator.seed_seq
+    if isinstance(seed, np.random.SeedSequence):
+        return np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key, pool_size=seed.pool_size,
+                                      n_children_spawned=seed.n_children_spawned)
+    return np.random.SeedSequence(seed)
+
+def _seed_state(root):
+    entropy = root.entropy if isinstance(root.entropy, int) else tuple(int(e) for e in root.entropy)
+    return entropy, tuple(root.spawn_key), root.pool_size, root.n_children_spawned
+
+def _from_state(state):
+    entropy, spawn_key, pool_size, n_children_spawned = state
+    return np.random.SeedSequence(entropy, spawn_key=spawn_key, pool_size=pool_size,
+                                  n_children_spawned=n_children_spawned)
+
+def _frame(value):
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+def _read(path):
+    # (header, records, end of the last whole frame)
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(_MAGIC):
+        raise ValueError(f"{path} is not a checkpoint log")
+    frames = []
+    offset = end = len(_MAGIC)
+    while offset + _FRAME.size <= len(data):
+        length, crc = _FRAME.unpack_from(data, offset)
+        payload = data[offset + _FRAME.size:offset + _FRAME.size + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break
+        frames.append(pickle.loads(payload))
+        offset = end = offset + _FRAME.size + length
+    if not frames:
+        raise ValueError(f"{path} has no header")
+    return frames[0], [record for frame in frames[1:] for record in frame], end
+
+class Checkpoint:
+    """Append-only checkpoint log at path
+
+    Records are written as one frame every `interval` seconds, and when
+    the run ends or is interrupted. Work that is computed in batches
+    (parallel tournaments, sweeps) is done `every` records at a time so
+    that there is something to write."""
+
+    def __init__(self, path, every=64, interval=5.0):
+        if every < 1:
+            raise ValueError(f"every must be at least 1, got {every!r}")
+        self.path = path
+        self.every = every
+        self.interval = interval
+        self._file = None
+        self._pending = []
+        self._last_write = time.monotonic()
+
+    def start(self, run, seed=None):
+        """Open the log for run (a description that must match on resume)
+
+        Returns (root seed, records already logged). A new log, with the
+        root of seed, is created atomically; an existing one keeps its own
+        root, and seed must be None or the same seed."""
+        if self._file is not None:
+            raise ValueError(f"{self.path} is already open")
+        if os.path.exists(self.path):
+            header, records, end = _read(self.path)
+            root = _from_state(header['seed'])
+            if header['run'] != run:
+                raise ValueError(f"{self.path} is a checkpoint of a different run")
+            if seed is not None and _seed_state(root_seed(seed)) != header['seed']:
+                raise ValueError(f"{self.path} was written with a different seed")
+            self._file = open(self.path, 'r+b')
+            self._file.truncate(end)  # Drop a torn last frame
+            self._file.seek(end)
+        else:
+            root = root_seed(seed)
+            temporary = self.path + '.tmp'
+            with open(temporary, 'wb') as f:
+                f.write(_MAGIC + _frame({'run': run, 'seed': _seed_state(root)}))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, self.path)
+            self._file = open(self.path, 'ab')
+            records = []
+        self._last_write = time.monotonic()
+        return root, records
+
+    def append(self, record):
+        self._pending.append(record)
+        if time.monotonic() - self._last_write >= self.interval:
+            self.write()
+
+    def write(self):
+        """Write the pending records as one frame"""
+        if self._pending and self._file is not None:
+            self._file.write(_frame(self._pending))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = []
+        self._last_write = time.monotonic()
+
+    def close(self):
+        self.write()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
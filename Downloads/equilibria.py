@@ -0,0 +1,252 @@
+from itertools import combinations
+
+import numpy as np
+
+# Nash equilibria of the symmetric meta-game between strategies. A[i, j] is
+# the payoff of strategy i against strategy j (the opponent gets A[j, i]),
+# hand-written or built from matches with evolution.from_games /
+# evolution.from_tournament. Every solver returns symmetric equilibria: a
+# mixed strategy x that is a best response to itself.
+#
+# support_enumeration and lemke_howson are exact. Support enumeration is
+# for small games; Lemke-Howson finishes in well under a second on many
+# random 500-strategy games but can need tens of thousands of pivots (10s
+# and more) on others. fictitious_play and regret_matching are iterative,
+# one matrix-vector product (or less) per step, and only approximate
+# general-sum games. solve(method='auto') bounds the work (see there). Use
+# exploitability to see how far any x is from an equilibrium.
+
+def exploitability(A, x):
+    """How much a pure strategy can gain against x over x itself (0 at an equilibrium)"""
+    A = np.asarray(A, dtype=np.float64)
+    payoffs = A @ x
+    return float(payoffs.max() - x @ payoffs)
+
+def named(x, player_classes, tol=1e-9):
+    """{strategy name: probability} for the strategies x plays"""
+    return {cls.__name__: float(p) for cls, p in zip(player_classes, x) if p > tol}
+
+def support_enumeration(A, max_support=None, tol=1e-9):
+    """Every symmetric equilibrium with support up to max_support strategies
+
+    For each support S the indifference conditions A[S, S] x = v, sum(x) = 1
+    are solved for all supports of one size at once as a batch of linear
+    systems; a solution is kept if x >= 0 and no strategy earns more than
+    v against it. Complete for nondegenerate games."""
+    A = np.asarray(A, dtype=np.float64)
+    n = len(A)
+    equilibria = []
+    for k in range(1, (max_support or n) + 1):
+        supports = np.array(list(combinations(range(n), k)), dtype=np.intp)
+        # [A_SS  -1] [x]   [0]
+        # [1^T    0] [v] = [1]
+        systems = np.zeros((len(supports), k + 1, k + 1))
+        systems[:, :k, :k] = A[supports[:, :, None], supports[:, None, :]]
+        systems[:, :k, k] = -1
+        systems[:, k, :k] = 1
+        solvable = np.abs(np.linalg.det(systems)) > tol
+        if not solvable.any():
+            continue
+        supports = supports[solvable]
+        rhs = np.zeros((len(supports), k + 1, 1))
+        rhs[:, k] = 1
+        solutions = np.linalg.solve(systems[solvable], rhs)[..., 0]
+        x, v = solutions[:, :k], solutions[:, k]
+        # Payoff of every pure strategy against each candidate
+        payoffs = np.einsum('nmk,mk->mn', A[:, supports], x)
+        keep = (x >= -tol).all(axis=1) & (payoffs <= v[:, None] + tol * max(1.0, np.abs(A).max())).all(axis=1)
+        for support, weights in zip(supports[keep], x[keep]):
+            equilibrium = np.zeros(n)
+            equilibrium[support] = np.clip(weights, 0, None)
+            equilibrium /= equilibrium.sum()
+            if not any(np.allclose(equilibrium, other, atol=1e-7) for other in equilibria):
+                equilibria.append(equilibrium)
+    return equilibria
+
+def _leaving_row(column, rhs, inverse_t, tol):
+    # Minimum ratio test, ties broken lexicographically on the rows of the
+    # basis inverse (the columns of inverse_t) so degenerate games cannot
+    # cycle
+    rows = np.flatnonzero(column > tol * max(1.0, np.abs(column).max()))
+    if not len(rows):
+        raise ValueError("Lemke-Howson hit an unbounded ray; is A finite?")
+    ratios = rhs[rows] / column[rows]
+    best = ratios <= ratios.min() + 1e-12 * max(1.0, abs(ratios.min()))
+    for lex in range(len(inverse_t)):
+        if best.sum() == 1:
+            break
+        rows = rows[best]
+        ratios = inverse_t[lex, rows] / column[rows]
+        best = ratios <= ratios.min() + 1e-12
+    return rows[np.flatnonzero(best)[0]]
+
+def _complementary_path(positive, label, tol):
+    # Follows the path that drops label from x = 0, yielding None after
+    # each pivot and the normalised equilibrium once the path ends
+    n = len(positive)
+    # Variables 0..n-1 are the x_i, n..2n-1 the slacks of A x <= 1
+    basis = np.arange(n, 2 * n)
+    # The basis inverse, transposed: its columns for rows whose slack is
+    # still basic stay unit vectors, so a pivot only rewrites the
+    # (contiguous) rows of inverse_t where the pivot row is nonzero
+    inverse_t = np.eye(n)
+    rhs = np.ones(n)
+    entering = label
+    while True:
+        column = positive[:, entering] @ inverse_t if entering < n else inverse_t[entering - n].copy()
+        row = _leaving_row(column, rhs, inverse_t, tol)
+        leaving = basis[row]
+        pivot = column[row]
+        column[row] = 0
+        rhs[row] /= pivot
+        rhs -= column * rhs[row]
+        inverse_t[:, row] /= pivot
+        pivot_row = inverse_t[:, row]
+        touched = np.flatnonzero(pivot_row)
+        inverse_t[touched] -= np.outer(pivot_row[touched], column)
+        basis[row] = entering
+        if leaving % n == label:
+            break
+        entering = (leaving + n) % (2 * n)  # Its complement enters next
+        yield None
+    x = np.zeros(n)
+    strategies = basis < n
+    x[basis[strategies]] = np.clip(rhs[strategies], 0, None)
+    yield x / x.sum()
+
+def lemke_howson(A, label=None, max_pivots=None, tol=1e-9):
+    """One symmetric equilibrium by complementary pivoting
+
+    Works on the polytope {x >= 0 : A x <= 1} (A shifted to be positive):
+    starting from x = 0 and dropping label, it pivots until every strategy
+    i again has x_i = 0 or (A x)_i = 1, and returns x normalised. Only the
+    basis inverse is kept and updated (one matrix-vector product and one
+    rank-one update per pivot).
+
+    Path lengths vary wildly between labels, so with label=None the paths
+    are followed side by side: each round starts the next label's path and
+    advances every open path by a budget that doubles from round to round,
+    returning whichever ends first. Different labels may find different
+    equilibria. Raises ValueError after max_pivots pivots in total."""
+    A = np.asarray(A, dtype=np.float64)
+    n = len(A)
+    if label is not None and not 0 <= label < n:
+        raise ValueError(f"label must index a strategy (0 to {n - 1}), got {label!r}")
+    if max_pivots is None:
+        max_pivots = 50 * n * n + 100
+    positive = A - A.min() + 1
+    labels = iter(range(n) if label is None else [label])
+    paths = []
+    budget = 32
+    pivots = 0
+    while pivots < max_pivots:
+        label = next(labels, None)
+        if label is not None:
+            paths.append(_complementary_path(positive, label, tol))
+        for path in paths:
+            for _, x in zip(range(min(budget, max_pivots - pivots)), path):
+                pivots += 1
+                if x is not None:
+                    return x
+        budget *= 2
+    raise ValueError(f"Lemke-Howson did not finish within {max_pivots} pivots")
+
+def fictitious_play(A, iterations=100_000, tol=1e-4, check=1000, x0=None):
+    """Empirical mix of repeatedly best responding to the empirical mix so far
+
+    The payoffs of the pure strategies against the counts are updated one
+    column of A per step, so a step costs O(n). Stops early once the
+    exploitability of the empirical mix (checked every `check` steps) is
+    at most tol."""
+    A = np.asarray(A, dtype=np.float64)
+    n = len(A)
+    counts = np.zeros(n) if x0 is None else np.asarray(x0, dtype=np.float64) * n
+    payoffs = A @ counts
+    columns = np.ascontiguousarray(A.T)
+    for t in range(1, iterations + 1):
+        best = int(payoffs.argmax())
+        counts[best] += 1
+        payoffs += columns[best]
+        if t % check == 0 and exploitability(A, counts / counts.sum()) <= tol:
+            break
+    return counts / counts.sum()
+
+def regret_matching(A, iterations=10_000, tol=1e-4, check=100, x0=None):
+    """Average strategy of self-play regret matching
+
+    Each step plays in proportion to the positive cumulative regrets of
+    the pure strategies (one matrix-vector product). Stops early once the
+    average's exploitability is at most tol."""
+    A = np.asarray(A, dtype=np.float64)
+    n = len(A)
+    regrets = np.zeros(n)
+    total = np.zeros(n)
+    x = np.full(n, 1 / n) if x0 is None else np.asarray(x0, dtype=np.float64)
+    for t in range(1, iterations + 1):
+        payoffs = A @ x
+        regrets += payoffs - x @ payoffs
+        total += x
+        positive = np.maximum(regrets, 0)
+        mass = positive.sum()
+        x = positive / mass if mass > 0 else np.full(n, 1 / n)
+        if t % check == 0 and exploitability(A, total / t) <= tol:
+            break
+    return total / total.sum()
+
+def _first_equilibrium(A, **kwargs):
+    # A degenerate game may have no equilibrium with a nonsingular support
+    equilibria = support_enumeration(A, **kwargs)
+    return equilibria[0] if equilibria else lemke_howson(A)
+
+# Lemke-Howson pivots 'auto' allows an n-strategy game: AUTO_WORK / n ** 2
+# (a pivot costs O(n ** 2)), about half a second on 500 strategies
+AUTO_WORK = 4e8
+
+def _bounded(A, max_pivots=None, iterations=100_000):
+    # A pure equilibrium if there is one (O(n ** 2)), else Lemke-Howson
+    # within the work budget, else fictitious play's approximation.
+    # Constant-sum games go straight to fictitious play, which converges
+    # on them, while their Lemke-Howson paths are long.
+    A = np.asarray(A, dtype=np.float64)
+    n = len(A)
+    if n <= 8:
+        return _first_equilibrium(A)
+    pure = support_enumeration(A, max_support=1)
+    if pure:
+        return pure[0]
+    sums = A + A.T
+    if np.allclose(sums, sums[0, 0]):
+        return fictitious_play(A, iterations)
+    if max_pivots is None:
+        max_pivots = max(1000, int(AUTO_WORK / n ** 2))
+    try:
+        return lemke_howson(A, max_pivots=max_pivots)
+    except ValueError:
+        return fictitious_play(A, iterations)
+
+AUTO_OPTIONS = ('max_pivots', 'iterations')
+
+SOLVERS = {
+    'support_enumeration': _first_equilibrium,
+    'lemke_howson': lemke_howson,
+    'fictitious_play': fictitious_play,
+    'regret_matching': regret_matching,
+    'auto': _bounded,
+}
+
+def solve(A, method='auto', **kwargs):
+    """One symmetric equilibrium of A
+
+    method is a key of SOLVERS. 'auto' takes under a second on 500
+    strategies: support enumeration up to 8 strategies; beyond, a pure
+    equilibrium if there is one, else Lemke-Howson for at most
+    AUTO_WORK / n ** 2 pivots, and if that is not enough (or the game is
+    constant-sum) fictitious play's approximation, so check its
+    exploitability. 'auto' only takes max_pivots and iterations, which
+    override the Lemke-Howson budget and fictitious play's iterations."""
+    if method not in SOLVERS:
+        raise ValueError(f"Unknown method {method!r}, expected one of {sorted(SOLVERS)}")
+    if method == 'auto' and not set(kwargs) <= set(AUTO_OPTIONS):
+        unknown = sorted(set(kwargs) - set(AUTO_OPTIONS))
+        raise ValueError(f"method='auto' does not take {unknown}, only {list(AUTO_OPTIONS)}")
+    return SOLVERS[method](A, **kwargs)
@@ -0,0 +1,163 @@
+import numpy as np
+from randomness import keyed_child, make_rng
+
+# Population dynamics over a fixed set of strategies. Everything works on
+# a payoff matrix A computed once, where A[i, j] is the mean score of
+# strategy i in a match against strategy j, so no match is replayed while
+# a population evolves.
+
+def payoff_matrix(player_classes, score):
+    """A[i, j] = score(player_classes[i], player_classes[j])"""
+    return np.array([[score(cls1, cls2) for cls2 in player_classes] for cls1 in player_classes],
+                    dtype=np.float64)
+
+def from_tournament(player_classes, matches=5, payoff=None, seed=None, workers=1, cache=None):
+    """Payoff matrix of mean play_match scores, self-play included"""
+    import tournament_dilemma
+
+    if payoff is None:
+        payoff = tournament_dilemma.CLASSIC
+    n = len(player_classes)
+    pairs = [(i, j) for i in range(n) for j in range(i, n)]
+    pairings = [(player_classes[i], player_classes[j]) for i, j in pairs]
+    pair_seeds = [keyed_child(seed, cls1.__name__, cls2.__name__) for cls1, cls2 in pairings]
+    outcomes = tournament_dilemma._play_pairings(pairings, pair_seeds, matches, payoff, seed is not None,
+                                                 workers, cache=cache)
+
+    A = np.empty((n, n))
+    for (i, j), pair_outcomes in zip(pairs, outcomes):
+        _, score1, score2 = np.mean(pair_outcomes, axis=0)
+        if i == j:
+            A[i, i] = (score1 + score2) / 2
+        else:
+            A[i, j], A[j, i] = score1, score2
+    return A
+
+def from_games(player_classes, rounds=1000, simulations=100, payoff=None, seed=None, method='auto'):
+    """Payoff matrix of mean Games.run_simulations scores, self-play included"""
+    import Games
+
+    if payoff is None:
+        payoff = Games.PAYOFF
+    n = len(player_classes)
+    pairs = [(i, j) for i in range(n) for j in range(i, n)]
+    results = Games.run_simulations([(player_classes[i], player_classes[j]) for i, j in pairs], rounds,
+                                    simulations, payoff, seed, method)
+
+    A = np.empty((n, n))
+    for (i, j), result in zip(pairs, results):
+        score1, score2 = result['player1_average_score'], result['player2_average_score']
+        if i == j:
+            A[i, i] = (score1 + score2) / 2
+        else:
+            A[i, j], A[j, i] = score1, score2
+    return A
+
+def _normalise(x):
+    x = np.clip(x, 0, None)
+    return x / x.sum(axis=-1, keepdims=True)
+
+def replicator(A, x0, steps, dt=0.01, method='continuous', background=None):
+    """Trajectory of the replicator dynamics from strategy frequencies x0
+
+    x0 may hold one population (n,) or a batch of them (..., n), all
+    stepped together. method='continuous' integrates
+    dx_i/dt = x_i (f_i - mean f) with fourth-order Runge-Kutta steps of
+    size dt; method='discrete' uses x_i' = x_i f_i / mean f, with the
+    background fitness added to every payoff (by default just enough to
+    make the smallest payoff 1). Returns an array of shape
+    (steps + 1,) + x0.shape."""
+    A = np.asarray(A, dtype=np.float64)
+    x = _normalise(np.asarray(x0, dtype=np.float64))
+    if x.shape[-1] != len(A):
+        raise ValueError(f"x0 has {x.shape[-1]} strategies, A has {len(A)}")
+    trajectory = np.empty((steps + 1,) + x.shape)
+    trajectory[0] = x
+
+    if method == 'discrete':
+        if background is None:
+            background = 1 - min(A.min(), 1)
+        for t in range(1, steps + 1):
+            fitness = x @ A.T + background
+            x = _normalise(x * fitness)
+            trajectory[t] = x
+    elif method == 'continuous':
+        def velocity(x):
+            fitness = x @ A.T
+            return x * (fitness - (x * fitness).sum(axis=-1, keepdims=True))
+
+        for t in range(1, steps + 1):
+            k1 = velocity(x)
+            k2 = velocity(x + dt / 2 * k1)
+            k3 = velocity(x + dt / 2 * k2)
+            k4 = velocity(x + dt * k3)
+            x = _normalise(x + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4))
+            trajectory[t] = x
+    else:
+        raise ValueError(f"Unknown method {method!r}, expected 'continuous' or 'discrete'")
+    return trajectory
+
+def moran(A, counts, steps, intensity=1.0, mutation=0.0, replicates=1, seed=None, record=False):
+    """Run independent Moran processes side by side
+
+    counts gives the number of individuals of each strategy, either once
+    (n,), shared by every replicate, or per replicate (replicates, n).
+    In each step one individual reproduces with probability proportional
+    to exp(intensity * mean payoff against the rest of its population),
+    its offspring switches to another strategy chosen uniformly with
+    probability mutation, and it replaces an individual picked uniformly
+    at random. Without mutation the run stops early once every replicate
+    has fixated. Returns the final (replicates, n) counts, or the whole
+    (steps + 1, replicates, n) history when record is set."""
+    A = np.asarray(A, dtype=np.float64)
+    n = len(A)
+    counts = np.array(np.broadcast_to(counts, (replicates, n)), dtype=np.int64)
+    size = counts.sum(axis=1)
+    if np.any(size != size[0]) or size[0] < 2:
+        raise ValueError("every replicate needs the same population size of at least 2")
+    size = int(size[0])
+
+    rng = make_rng(seed)
+    lanes = np.arange(replicates)
+    self_payoff = np.diag(A)
+    history = [counts.copy()] if record else None
+    # A lone strategy has nothing to mutate into
+    mutating = bool(mutation) and n > 1
+    for _ in range(steps):
+        # Mean payoff of each strategy against everyone else in its population
+        payoffs = (counts @ A.T - self_payoff) / (size - 1)
+        weights = np.exp(intensity * (payoffs - payoffs.max(axis=1, keepdims=True))) * counts
+        cumulative = np.cumsum(weights, axis=1)
+        parent = np.argmax(cumulative > rng.random(replicates)[:, None] * cumulative[:, -1:], axis=1)
+
+        child = parent
+        if mutating:
+            mutant = rng.random(replicates) < mutation
+            child = np.where(mutant, (parent + rng.integers(1, n, size=replicates)) % n, parent)
+
+        dead = np.argmax(np.cumsum(counts, axis=1) > rng.integers(size, size=replicates)[:, None], axis=1)
+        counts[lanes, dead] -= 1
+        counts[lanes, child] += 1
+        if record:
+            history.append(counts.copy())
+        elif not mutating and np.all(counts.max(axis=1) == size):
+            break
+    return np.array(history) if record else counts
+
+def fixation_probabilities(A, size, intensity=1.0):
+    """rho[i, j]: chance one i-mutant takes over a population of j (no mutation)
+
+    Closed form for the Moran process of moran() with two strategies
+    present, evaluated for every ordered pair at once. Neutral drift gives
+    1 / size."""
+    A = np.asarray(A, dtype=np.float64)
+    m = np.arange(1, size)  # Number of mutants
+    a_ii = np.diag(A)[:, None, None]
+    a_jj = np.diag(A)[None, :, None]
+    a_ij = A[:, :, None]
+    a_ji = A.T[:, :, None]
+    mutant = (a_ii * (m - 1) + a_ij * (size - m)) / (size - 1)
+    resident = (a_ji * m + a_jj * (size - m - 1)) / (size - 1)
+    log_ratio = np.cumsum(intensity * (resident - mutant), axis=-1)
+    # rho = 1 / (1 + sum_k prod_{m <= k} f_j(m) / f_i(m)), in log space
+    return np.exp(-np.logaddexp(0, np.logaddexp.reduce(log_ratio, axis=-1)))
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Evolve machine strategies (see machines.py) against a fixed opponent pool
+
+    python genetic.py [--representation lookup|machine] [--memory K]
+                      [--states N] [--population N] [--generations N]
+                      [--workers N] [--seed N]
+
+A genome is a memory-k lookup table (4 ** k bits) or a finite-state
+machine with a fixed number of states (one output bit and two
+transitions per state). Fitness is a genome's mean score per round
+against every opponent, from Games' pairing engine: a whole generation
+is one batched call (matches between machines are single table-lookup
+passes), optionally split over a process pool. Every opponent is always
+met with the same seed, so fitness is a function of the genome alone and
+is cached for every genome already seen."""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import machines
+from payoff import CLASSIC
+from randomness import keyed_child, make_rng
+from reporting import Reporter, TextReporter
+
+REPRESENTATIONS = ('lookup', 'machine')
+
+def genome_length(representation, size):
+    """Genes per genome: 4 ** memory for lookup tables, 3 * states for machines"""
+    if representation == 'lookup':
+        return 4 ** size
+    if representation == 'machine':
+        return 3 * size
+    raise ValueError(f"Unknown representation {representation!r}, expected one of {REPRESENTATIONS}")
+
+def decode(genome, representation, size):
+    """The Machine a genome describes
+
+    A machine genome is the outputs of its `size` states followed by their
+    (after cooperation, after defection) transitions."""
+    if representation == 'lookup':
+        return machines.lookup_table(genome, size)
+    return machines.Machine(np.reshape(genome[size:], (size, 2)), genome[:size])
+
+def random_genomes(rng, count, representation, size):
+    length = genome_length(representation, size)
+    genomes = rng.integers(0, 2, (count, length), dtype=np.intp)
+    if representation == 'machine':
+        genomes[:, size:] = rng.integers(0, size, (count, length - size), dtype=np.intp)
+    return genomes
+
+def mutate(rng, genomes, rate, representation, size):
+    """Flip each output bit, and redraw each transition, with probability rate"""
+    mutated = rng.random(genomes.shape) < rate
+    if representation == 'lookup':
+        return genomes ^ mutated
+    genomes = genomes.copy()
+    genomes[:, :size] ^= mutated[:, :size]
+    redraw = mutated[:, size:]
+    genomes[:, size:][redraw] = rng.integers(0, size, int(redraw.sum()), dtype=np.intp)
+    return genomes
+
+def crossover(rng, parents1, parents2, representation, size):
+    """Uniform crossover: each table entry (or each state, with its
+    output and transitions) comes from either parent"""
+    if representation == 'lookup':
+        take = rng.random(parents1.shape) < 0.5
+    else:
+        states = rng.random((len(parents1), size)) < 0.5
+        take = np.concatenate([states, np.repeat(states, 2, axis=1)], axis=1)
+    return np.where(take, parents1, parents2)
+
+def _scores(task):
+    # Mean score per round of each machine against every opponent (runs in
+    # a worker process when the search has workers)
+    import Games
+
+    genome_machines, opponents, seeds, rounds, simulations, payoff = task
+    players = [machines.machine_player('Evolved', machine) for machine in genome_machines]
+    pairings = [(player, opponent) for player in players for opponent in opponents]
+    results = Games._simulate_pairings(pairings, seeds * len(players), rounds, simulations, payoff)
+    scores = np.array([result['player1_average_score'] for result in results]) / rounds
+    return scores.reshape(len(players), len(opponents)).mean(axis=1)
+
+def search(opponents, representation='lookup', memory=1, states=4, population=50, generations=100,
+           workers=1, rounds=100, simulations=5, payoff=CLASSIC, mutation=None, crossover_rate=0.9,
+           elite=2, tournament=3, seed=None, reporter=None):
+    """Genetic search for the machine scoring best against opponents
+
+    Each generation keeps the `elite` best genomes and breeds the rest
+    from parents picked by tournament selection (the best of `tournament`
+    random genomes), with uniform crossover (probability crossover_rate)
+    and mutation at rate `mutation` per gene (default 1 / genes). Fitness
+    is the mean score per round over `simulations` matches of `rounds`
+    rounds against each opponent; genomes not seen before are scored in
+    one batch, spread over `workers` processes (None meaning one per CPU)
+    when workers != 1. Generations are reported to reporter as
+    'search_start', 'generation' and 'search_end' events.
+
+    Returns a dict with the best 'genome', its 'machine' and 'fitness',
+    the (best, mean) fitness of every generation ('history') and the
+    number of genomes scored ('evaluations')."""
+    size = memory if representation == 'lookup' else states
+    length = genome_length(representation, size)
+    if population < 2 or not 0 <= elite < population:
+        raise ValueError(f"Need a population of at least 2 and 0 <= elite < population, "
+                         f"got {population} and {elite}")
+    if mutation is None:
+        mutation = 1 / length
+    if reporter is None:
+        reporter = Reporter()
+    opponents = list(opponents)
+    # Without a seed, fix fresh entropy now so every genome meets the
+    # opponents with the same seeds
+    root = np.random.SeedSequence() if seed is None else seed
+    rng = make_rng(keyed_child(root, 'search'))
+    seeds = [keyed_child(root, opponent.__name__) for opponent in opponents]
+    cache = {}
+
+    def evaluate(genomes):
+        keys = [genome.tobytes() for genome in genomes]
+        new = list({key: genome for key, genome in zip(keys, genomes) if key not in cache}.items())
+        if new:
+            genome_machines = [decode(genome, representation, size) for _, genome in new]
+            # One chunk per process, dealt round-robin
+            count = min(len(new), 1 if workers == 1 else workers or os.cpu_count() or 1)
+            tasks = [(genome_machines[k::count], opponents, seeds, rounds, simulations, payoff)
+                     for k in range(count)]
+            if count == 1:
+                scores = [_scores(tasks[0])]
+            else:
+                with ProcessPoolExecutor(max_workers=count) as executor:
+                    scores = list(executor.map(_scores, tasks))
+            fitness = np.empty(len(new))
+            for k, chunk_scores in enumerate(scores):
+                fitness[k::count] = chunk_scores
+            cache.update(zip((key for key, _ in new), fitness.tolist()))
+        return np.array([cache[key] for key in keys])
+
+    genomes = random_genomes(rng, population, representation, size)
+    history = []
+    if reporter.listening:
+        reporter.emit('search_start', total=generations, population=population,
+                      opponents=[opponent.__name__ for opponent in opponents])
+    for generation in range(generations):
+        fitness = evaluate(genomes)
+        history.append((float(fitness.max()), float(fitness.mean())))
+        if reporter.listening:
+            reporter.emit('generation', generation=generation + 1, total=generations, best=history[-1][0],
+                          mean=history[-1][1], evaluations=len(cache))
+        if generation == generations - 1:
+            break
+        ranking = np.argsort(-fitness, kind='stable')
+        children = population - elite
+        contenders = rng.integers(0, population, (2 * children, tournament))
+        winners = contenders[np.arange(2 * children), fitness[contenders].argmax(axis=1)]
+        parents1, parents2 = genomes[winners[:children]], genomes[winners[children:]]
+        offspring = np.where(rng.random((children, 1)) < crossover_rate,
+                             crossover(rng, parents1, parents2, representation, size), parents1)
+        genomes = np.concatenate([genomes[ranking[:elite]],
+                                  mutate(rng, offspring, mutation, representation, size)])
+    if reporter.listening:
+        reporter.emit('search_end')
+        reporter.flush()
+
+    best = int(np.argmax(fitness))
+    return {
+        'genome': genomes[best],
+        'machine': decode(genomes[best], representation, size),
+        'fitness': float(fitness[best]),
+        'history': history,
+        'evaluations': len(cache),
+    }
+
+def main(argv=None):
+    import strategies
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--representation', choices=REPRESENTATIONS, default='lookup')
+    parser.add_argument('--memory', type=int, default=1, help="lookup table memory (rounds)")
+    parser.add_argument('--states', type=int, default=4, help="machine states")
+    parser.add_argument('--population', type=int, default=50)
+    parser.add_argument('--generations', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=1, help="0 for one per CPU")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    opponents = [strategies.lookup(name) for name in sorted(strategies.STRATEGIES)]
+    with TextReporter() as reporter:
+        best = search(opponents, args.representation, args.memory, args.states, args.population,
+                      args.generations, args.workers or None, seed=args.seed, reporter=reporter)
+    print(f"Best fitness {best['fitness']:.4f} per round after {best['evaluations']} evaluations")
+    print(best['machine'])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import copyreg
+import sys
+
+import numpy as np
+from actions import COOPERATE, DEFECT
+from payoff import outcome_counts
+from strategies import Player, declared
+
+# Strategies written as data instead of code: a deterministic finite-state
+# machine over small integer arrays. transitions[s, 2 * own + a] is the
+# state a machine in state s moves to after a round in which it played own
+# and its opponent a (0 cooperate, 1 defect), and outputs[s] the move it
+# makes in state s (True meaning defect, as in the batch kernels). Play
+# starts in state 0: the first move is outputs[0], and every later round
+# first applies the transition for the previous round's moves. Those are
+# the moves actually played, so under execution noise a machine follows
+# its flipped moves, not the ones it meant to make. A machine that only
+# reacts to its opponent can be given transitions of shape (states, 2),
+# indexed by the opponent's move alone.
+#
+# A memory-k lookup table compiles to such a machine (lookup_table), and
+# so do the library's deterministic strategies (TIT_FOR_TAT, GRIM_TRIGGER,
+# grim_trigger_mix, ...). A MachinePlayer subclass plays one; the engines
+# run it by array indexing, and play() plays any number of machine
+# matches in a single vectorized pass.
+#
+# In group play a machine sees whether any of its opponents defected, so
+# strategies that count defecting opponents (GrimTriggerMix) or weigh
+# them (TitForTatMixed) only agree with their machines in matches.
+
+class Machine:
+    """A finite-state strategy: transitions (states x 4, or states x 2) and outputs (states)"""
+    __slots__ = ('transitions', 'outputs', '_next', '_moves')
+
+    def __init__(self, transitions, outputs):
+        transitions = np.array(transitions, dtype=np.intp)
+        outputs = np.array(outputs, dtype=bool)
+        states = len(outputs)
+        if states == 0 or outputs.shape != (states,) or transitions.shape not in ((states, 2), (states, 4)):
+            raise ValueError(f"Expected outputs of shape (states,) and transitions of shape (states, 4) or "
+                             f"(states, 2), got {outputs.shape} and {transitions.shape}")
+        if transitions.shape[1] == 2:
+            transitions = np.tile(transitions, 2)  # The same whatever its own move
+        if transitions.min() < 0 or transitions.max() >= states:
+            raise ValueError(f"Transitions must lead to states 0 to {states - 1}")
+        self.transitions = transitions
+        self.outputs = outputs
+        # Plain lists for the one-round-at-a-time choose_action
+        self._next = transitions.tolist()
+        self._moves = [DEFECT if output else COOPERATE for output in outputs.tolist()]
+
+    @property
+    def states(self):
+        return len(self.outputs)
+
+    def key(self):
+        """Hashable description of the machine (equal machines, equal keys)"""
+        return (tuple(self.transitions.ravel().tolist()), tuple(self.outputs.tolist()))
+
+    def __eq__(self, other):
+        return isinstance(other, Machine) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f"Machine({self.transitions.tolist()}, {self.outputs.astype(int).tolist()})"
+
+    def _rounds(self):
+        # Successive sets of states the machine can be in, split by what it
+        # has seen in noiseless play: after a round with its own move m and
+        # the opponent's move a, a set S becomes
+        # {transitions[s, 2 * m + a] : s in S, outputs[s] == m}
+        sets = {frozenset(range(self.states))}
+        while True:
+            yield sets
+            sets = {frozenset(int(self.transitions[s, 2 * own + a]) for s in states if self.outputs[s] == own)
+                    for states in sets for own in (0, 1) for a in (0, 1)} - {frozenset()}
+
+    def memory_depth(self):
+        """Rounds of history (both players' moves) that determine its move; inf if unbounded
+
+        Like the library's declarations, this is for noiseless play: a
+        move noise has flipped can make a machine act on a longer history."""
+        seen = set()
+        for depth, sets in enumerate(self._rounds()):
+            if all(len({bool(self.outputs[s]) for s in states}) == 1 for states in sets):
+                return depth
+            key = frozenset(sets)
+            if key in seen:
+                return float('inf')
+            seen.add(key)
+
+    def memory_one(self):
+        """(p_cc, p_cd, p_dc, p_dd, p_first) as in memory_one.py, or None if memory_depth > 1"""
+        if self.memory_depth() > 1:
+            return None
+        cooperates = []
+        for own in (0, 1):
+            for a in (0, 1):
+                after = {int(self.transitions[s, 2 * own + a]) for s in range(self.states) if self.outputs[s] == own}
+                # A move the machine never makes leaves any state possible
+                after = after or {int(self.transitions[s, 2 * own + a]) for s in range(self.states)}
+                cooperates.append(int(not self.outputs[min(after)]))
+        return tuple(cooperates) + (int(not self.outputs[0]),)
+
+def lookup_table(table, memory=1):
+    """Machine playing table[h] after history h of the last `memory` rounds
+
+    Each round is coded 2 * own + opponent (0 cooperate, 1 defect) and h
+    is the base-4 number of those codes, oldest first, so table has
+    4 ** memory entries (moves or 0/1). Rounds before the first count as
+    mutual cooperation."""
+    table = np.array([bool(move) for move in table])
+    size = 4 ** memory
+    if len(table) != size:
+        raise ValueError(f"A memory-{memory} lookup table needs {size} entries, got {len(table)}")
+    history = np.arange(size)
+    transitions = (history[:, None] * 4 + np.arange(4)) % size
+    return Machine(transitions, table)
+
+def grim_trigger_mix(limit=3):
+    """Cooperate until the opponent has defected limit times in all, then defect"""
+    counts = np.arange(limit + 1)
+    return Machine(np.stack([counts, np.minimum(counts + 1, limit)], axis=1), counts >= limit)
+
+ALWAYS_COOPERATE = Machine([[0, 0]], [False])
+ALWAYS_DEFECT = Machine([[0, 0]], [True])
+TIT_FOR_TAT = Machine([[0, 1], [0, 1]], [False, True])
+GRIM_TRIGGER = Machine([[0, 1], [1, 1]], [False, True])
+GRIM_TRIGGER_MIX = grim_trigger_mix(3)
+
+class _MachineClass(type):
+    pass
+
+def _reduce_machine_class(cls):
+    # Classes pickle by name, which fails for ones made by machine_player;
+    # those are rebuilt from their machine instead (in a worker process)
+    if getattr(sys.modules.get(cls.__module__), cls.__qualname__, None) is cls:
+        return cls.__qualname__
+    return machine_player, (cls.__name__, cls.machine)
+
+copyreg.pickle(_MachineClass, _reduce_machine_class)
+
+class MachinePlayer(Player, metaclass=_MachineClass):
+    """A player whose strategy is the Machine in its class attribute `machine`
+
+    Subclasses only set machine; they are given choose_action, the batch
+    kernel and their metadata (deterministic, memory_depth, memory_one)
+    computed from it. The batch kernel follows the moves actually played
+    (batch_own_moves)."""
+    __slots__ = ('state',)
+    machine = None
+    batch_own_moves = True
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if 'choose_action' in vars(cls):
+            return  # A strategy of its own, declaring its own metadata
+        machine = cls.machine
+        if not isinstance(machine, Machine):
+            raise ValueError(f"{cls.__name__}.machine must be a Machine, got {machine!r}")
+        # Metadata belongs next to choose_action (see strategies.declared),
+        # and every machine is a different strategy
+        for name in ('choose_action', 'choose_batch', 'init_batch_state'):
+            setattr(cls, name, vars(MachinePlayer)[name])
+        cls.deterministic = True
+        cls.memory_depth = machine.memory_depth()
+        cls.memory_one = machine.memory_one()
+        cls.parameters = machine.key()  # Tells machines apart in match_cache keys
+
+    def reset(self):
+        super().reset()
+        self.state = 0
+
+    def choose_action(self, opponents):
+        machine = self.machine
+        if self.last_action is not None:
+            defected = any(opponent.last_action == DEFECT for opponent in opponents)
+            self.state = machine._next[self.state][2 * (self.last_action == DEFECT) + defected]
+        return machine._moves[self.state]
+
+    @staticmethod
+    def init_batch_state(n):
+        return np.zeros(n, dtype=np.intp)
+
+    @classmethod
+    def choose_batch(cls, state, cooperators, defectors, degree, uniforms, own):
+        # Agents that saw nobody (the first round) stay in their state
+        seen = (cooperators + defectors) > 0
+        outcome = 2 * own[seen].view(np.int8) + (defectors[seen] > 0).view(np.int8)
+        state[seen] = cls.machine.transitions[state[seen], outcome]
+        return cls.machine.outputs[state]
+
+def machine_player(name, machine):
+    """A new MachinePlayer subclass called name playing machine"""
+    return type(name, (MachinePlayer,), {'__slots__': (), 'machine': machine})
+
+def is_machine(player_class):
+    """Whether player_class plays its machine (no choose_action of its own)"""
+    return (issubclass(player_class, MachinePlayer) and player_class.machine is not None
+            and declared(player_class, 'choose_action') is vars(MachinePlayer)['choose_action'])
+
+def play(pairs, rounds, payoff):
+    """(scores1, scores2) of a match between each pair of machines
+
+    Every match is played at once: the machines are stacked into one set
+    of tables and each round is a handful of array lookups for all pairs."""
+    if not pairs:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    unique = {}
+    for pair in pairs:
+        for machine in pair:
+            unique.setdefault(machine, len(unique))
+    machines = list(unique)
+    offsets = np.cumsum([0] + [machine.states for machine in machines])
+    transitions = np.concatenate([machine.transitions + offset for machine, offset in zip(machines, offsets)])
+    outputs = np.concatenate([machine.outputs for machine in machines]).view(np.int8)
+    state1 = offsets[[unique[machine1] for machine1, _ in pairs]]
+    state2 = offsets[[unique[machine2] for _, machine2 in pairs]]
+
+    defects1 = np.zeros(len(pairs), dtype=np.int64)
+    defects2 = np.zeros(len(pairs), dtype=np.int64)
+    mutual_defects = np.zeros(len(pairs), dtype=np.int64)
+    for _ in range(rounds):
+        action1 = outputs[state1]
+        action2 = outputs[state2]
+        defects1 += action1
+        defects2 += action2
+        mutual_defects += action1 & action2
+        state1 = transitions[state1, 2 * action1 + action2]
+        state2 = transitions[state2, 2 * action2 + action1]
+
+    return payoff.scores(*outcome_counts(rounds, defects1, defects2, mutual_defects))
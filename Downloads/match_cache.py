@@ -0,0 +1,144 @@
+import pickle
+import sqlite3
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+from strategies import declared
+
+# Strategies whose play never depends on random draws declare a class
+# attribute `deterministic = True`; their pairings are cached regardless of
+# the seed. Anything else is only cached for a reproducible seed.
+
+def declared_deterministic(player_class):
+    """Whether player_class declares deterministic play next to its choose_action"""
+    return bool(declared(player_class, 'deterministic', False))
+
+def is_deterministic_pair(player1_class, player2_class):
+    return declared_deterministic(player1_class) and declared_deterministic(player2_class)
+
+def strategy_key(player_class):
+    """Stable name of a strategy: module.qualname plus its `parameters`, if any"""
+    name = f"{player_class.__module__}.{player_class.__qualname__}"
+    parameters = getattr(player_class, 'parameters', None)
+    return name if parameters is None else (name, parameters)
+
+def seed_token(seed):
+    """Hashable description of a reproducible seed, or None if it is not one"""
+    if isinstance(seed, (int, np.integer)):
+        return int(seed)
+    if isinstance(seed, np.random.SeedSequence):
+        entropy = seed.entropy
+        if not isinstance(entropy, int):
+            entropy = tuple(int(e) for e in entropy)
+        return (entropy, tuple(seed.spawn_key))
+    return None
+
+def match_key(player1_class, player2_class, rounds, payoff, seed, *extra, stochastic=False):
+    """Cache key for one match/pairing, or None if the result is not reproducible
+
+    stochastic marks play that is random even between deterministic
+    strategies (noisy play), which is only cached for a seed."""
+    if not stochastic and is_deterministic_pair(player1_class, player2_class):
+        token = 'deterministic'
+    else:
+        token = seed_token(seed)
+        if token is None:
+            return None
+    return (strategy_key(player1_class), strategy_key(player2_class), rounds, payoff.values, token) + extra
+
+def _commit_and_close(db):
+    db.commit()
+    db.close()
+
+class MatchCache:
+    """Match results keyed by strategy pair, rounds, payoff and seed
+
+    Keeps the most recently used maxsize entries in memory. With a path,
+    every entry is also written to an SQLite file so later runs (and
+    tournaments that only add a strategy) can reuse it.
+
+    Writes are committed every 256 puts and by flush(). Every engine call
+    given a cache (play_match, run_tournament, Tournament, run_simulation,
+    run_simulations, run_sweep) flushes it before returning; inside
+    hold() those flushes wait for the end of the outermost hold. close(),
+    leaving a with block, garbage collection of the cache and interpreter
+    exit all commit what is left."""
+
+    def __init__(self, maxsize=4096, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._db = None
+        self._uncommitted = 0
+        self._holds = 0
+        if path is not None:
+            self._db = sqlite3.connect(path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS matches (key TEXT PRIMARY KEY, value BLOB)")
+            self._finalizer = weakref.finalize(self, _commit_and_close, self._db)
+
+    def get(self, key):
+        """Cached value for key, or None"""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+        if self._db is not None:
+            row = self._db.execute("SELECT value FROM matches WHERE key = ?", (repr(key),)).fetchone()
+            if row is not None:
+                value = pickle.loads(row[0])
+                self._remember(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self._db is not None:
+            self._db.execute("INSERT OR REPLACE INTO matches VALUES (?, ?)",
+                             (repr(key), pickle.dumps(value)))
+            self._uncommitted += 1
+            if self._uncommitted >= 256:
+                self._commit()
+
+    def flush(self):
+        """Commit pending writes to the SQLite file (at the end of the
+        outermost hold() when inside one)"""
+        if self._db is not None and self._uncommitted and not self._holds:
+            self._commit()
+
+    @contextmanager
+    def hold(self):
+        """Defer flushes to the end of this block, so an engine playing many
+        matches commits once rather than after every match"""
+        self._holds += 1
+        try:
+            yield self
+        finally:
+            self._holds -= 1
+            self.flush()
+
+    def _commit(self):
+        self._db.commit()
+        self._uncommitted = 0
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def close(self):
+        if self._db is not None:
+            self._finalizer()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,127 @@
+import numpy as np
+from strategies import declared
+
+# Memory-one strategies declare a class attribute
+#
+#     memory_one = (p_cc, p_cd, p_dc, p_dd, p_first)
+#
+# giving the probability of cooperating after each (own, opponent) outcome
+# of the previous round and in the first round. A match between two of them
+# is a Markov chain on the four outcomes CC, CD, DC, DD (seen from player
+# 1), so it can be solved without playing any rounds.
+
+def declared_memory_one(player_class):
+    """The memory_one vector of player_class, or None if it has none
+    (declared as in strategies.declared)"""
+    return declared(player_class, 'memory_one')
+
+def is_deterministic(vector):
+    return all(p in (0, 1) for p in vector)
+
+def transition_matrix(vector1, vector2):
+    """4x4 transition matrix over outcomes (CC, CD, DC, DD) from player 1's view"""
+    p1 = np.asarray(vector1[:4], dtype=np.float64)
+    # Player 2 sees CD as DC and vice versa
+    p2 = np.asarray(vector2[:4], dtype=np.float64)[[0, 2, 1, 3]]
+    return np.column_stack((p1 * p2, p1 * (1 - p2), (1 - p1) * p2, (1 - p1) * (1 - p2)))
+
+def first_round(vector1, vector2):
+    p1, p2 = vector1[4], vector2[4]
+    return np.array([p1 * p2, p1 * (1 - p2), (1 - p1) * p2, (1 - p1) * (1 - p2)])
+
+def _power_and_sum(matrix, power):
+    """(matrix**power, sum of matrix**t for t < power) in O(log power) products"""
+    result = np.eye(len(matrix))
+    total = np.zeros_like(matrix)
+    base = matrix
+    base_sum = np.eye(len(matrix))  # sum of matrix**t below the current bit
+    while power:
+        if power & 1:
+            total = total + result @ base_sum
+            result = result @ base
+        power >>= 1
+        if power:
+            base_sum = base_sum + base @ base_sum
+            base = base @ base
+    return result, total
+
+def expected_scores(vector1, vector2, rounds, payoff):
+    """Expected total score of each player over `rounds` rounds"""
+    if rounds <= 0:
+        return 0.0, 0.0
+    _, visits = _power_and_sum(transition_matrix(vector1, vector2), rounds)
+    # Expected number of rounds spent in each outcome
+    occupancy = first_round(vector1, vector2) @ visits
+    R, S, T, P = payoff.values
+    score1 = occupancy @ np.array([R, S, T, P], dtype=np.float64)
+    score2 = occupancy @ np.array([R, T, S, P], dtype=np.float64)
+    return score1.item(), score2.item()
+
+def _poly_matmul(a, b):
+    # a, b: (4, 4, L) arrays of polynomial coefficients
+    size = a.shape[-1] + b.shape[-1] - 1
+    n = 1 << (size - 1).bit_length()
+    fa = np.fft.rfft(a, n)
+    fb = np.fft.rfft(b, n)
+    return np.fft.irfft(np.einsum('ikf,kjf->ijf', fa, fb), n)[..., :size]
+
+def outcome_probabilities(vector1, vector2, rounds, payoff):
+    """(P(player 1 wins), P(player 2 wins), P(draw)) after `rounds` rounds
+
+    Only CD and DC rounds change the score difference, by -(T - S) and
+    +(T - S), so the result follows from the distribution of
+    #DC - #CD. That distribution is the coefficient list of a matrix power
+    of polynomials in z (z^+1 on entering DC, z^-1 on entering CD),
+    computed by repeated squaring with FFT convolutions."""
+    R, S, T, P = payoff.values
+    if rounds <= 0 or T == S:
+        return 0.0, 0.0, 1.0
+
+    # Polynomials are stored with exponent e at index e + offset
+    step = np.zeros((4, 4, 3))
+    markers = np.array([1, 0, 2, 1])  # z^0, z^-1, z^+1, z^0
+    step[np.arange(4)[:, None], np.arange(4)[None, :], markers[None, :]] = transition_matrix(vector1, vector2)
+    step_offset = 1
+
+    result = np.zeros((4, 4, 1))
+    result[np.arange(4), np.arange(4), 0] = 1
+    result_offset = 0
+    power = rounds - 1
+    while power:
+        if power & 1:
+            result = _poly_matmul(result, step)
+            result_offset += step_offset
+        power >>= 1
+        if power:
+            step = _poly_matmul(step, step)
+            step_offset *= 2
+
+    # The first-round outcome moves the difference too
+    start = np.zeros((4, 3))
+    start[np.arange(4), markers] = first_round(vector1, vector2)
+    distribution = sum(np.convolve(start[s], result[s].sum(axis=0)) for s in range(4))
+    offset = result_offset + 1
+    # Drop FFT round-off so impossible outcomes come out as exactly zero
+    distribution[distribution < 1e-12] = 0
+    distribution /= distribution.sum()
+
+    ahead = distribution[offset + 1:].sum()  # more DC than CD rounds
+    behind = distribution[:offset].sum()
+    draw = distribution[offset]
+    if T < S:
+        ahead, behind = behind, ahead
+    return ahead.item(), behind.item(), draw.item()
+
+def solve_match(vector1, vector2, rounds, payoff):
+    """Scores and outcome probabilities of a match between two memory-one strategies
+
+    Returns (score1, score2, p_win1, p_win2, p_draw). For deterministic
+    pairs the scores are exact (ints when the payoffs are ints) and exactly
+    one of the probabilities is 1."""
+    score1, score2 = expected_scores(vector1, vector2, rounds, payoff)
+    if not (is_deterministic(vector1) and is_deterministic(vector2)):
+        return (score1, score2) + outcome_probabilities(vector1, vector2, rounds, payoff)
+
+    if all(isinstance(value, (int, np.integer)) for value in payoff.values):
+        score1, score2 = round(score1), round(score2)
+    return (score1, score2, float(score1 > score2), float(score2 > score1), float(score1 == score2))
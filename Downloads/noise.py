@@ -0,0 +1,49 @@
+import numpy as np
+from actions import COOPERATE, DEFECT
+
+# Trembling-hand play. With execution noise every move a player intends is
+# flipped with probability `noise`; with misperception a player sees each
+# opponent's last move flipped with probability `misperception` (payoffs
+# still follow the moves really played). The errors are drawn in bulk as
+# boolean masks, a block of rounds at a time, never one draw per round.
+
+def check(noise, misperception):
+    """Validate both probabilities; True if any noise is on"""
+    for name, value in (('noise', noise), ('misperception', misperception)):
+        if not 0 <= value <= 1:
+            raise ValueError(f"{name} must be a probability between 0 and 1, got {value!r}")
+    return bool(noise or misperception)
+
+def flip(action):
+    return COOPERATE if action == DEFECT else DEFECT
+
+def masks(rng, shape, noise, misperception):
+    """Bool array of shape + (4,): flip1, flip2, misread1, misread2 per entry
+
+    flip is whether a player's move is flipped, misread whether it
+    misreads its opponent's last move."""
+    probabilities = np.array([noise, noise, misperception, misperception], dtype=np.float32)
+    return rng.random(tuple(shape) + (4,), dtype=np.float32) < probabilities
+
+def round_errors(rng, rounds, noise, misperception, block=4096):
+    """(flip1, flip2, misread1, misread2) for each round of a two-player match"""
+    for start in range(0, rounds, block):
+        yield from masks(rng, (min(block, rounds - start),), noise, misperception).tolist()
+
+def _choose(player, opponent, misread):
+    if misread and opponent.last_action is not None:
+        # Show the opponent's last move flipped, just while player decides
+        seen = opponent.last_action
+        opponent.last_action = flip(seen)
+        try:
+            return player.choose_action([opponent])
+        finally:
+            opponent.last_action = seen
+    return player.choose_action([opponent])
+
+def noisy_actions(player1, player2, errors):
+    """The moves actually played in a round with the given errors"""
+    flip1, flip2, misread1, misread2 = errors
+    action1 = _choose(player1, player2, misread1)
+    action2 = _choose(player2, player1, misread2)
+    return (flip(action1) if flip1 else action1), (flip(action2) if flip2 else action2)
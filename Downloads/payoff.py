@@ -0,0 +1,80 @@
+import numpy as np
+
+# Required orderings of (reward, sucker, temptation, punishment) per game,
+# written as Python expressions in R, S, T and P
+GAME_ORDERINGS = {
+    'prisoners_dilemma': 'T > R > P > S and 2 * R > T + S',
+    'snowdrift': 'T > R > S > P',
+    'stag_hunt': 'R > T >= P > S',
+}
+
+# The checks are compiled from the orderings, so the two cannot disagree
+GAME_CHECKS = {game: eval(f"lambda R, S, T, P: {ordering}") for game, ordering in GAME_ORDERINGS.items()}
+
+class PayoffMatrix:
+    """Symmetric 2x2 game payoffs indexed by Action codes
+
+    matrix[a1, a2] is the payoff to a player choosing a1 against a2, so the
+    row for COOPERATE is (R, S) and the row for DEFECT is (T, P)."""
+
+    def __init__(self, reward, sucker, temptation, punishment, game='prisoners_dilemma'):
+        if game is not None:
+            if game not in GAME_CHECKS:
+                raise ValueError(f"Unknown game {game!r}, expected one of {sorted(GAME_CHECKS)} or None")
+            if not GAME_CHECKS[game](reward, sucker, temptation, punishment):
+                raise ValueError(f"Payoffs R={reward}, S={sucker}, T={temptation}, P={punishment} "
+                                 f"are not a {game} game ({GAME_ORDERINGS[game]})")
+
+        self.reward = reward
+        self.sucker = sucker
+        self.temptation = temptation
+        self.punishment = punishment
+        self.game = game
+        self.matrix = np.array([[reward, sucker], [temptation, punishment]])
+        # Plain tuples for the per-round engines: outcomes[a1][a2] -> (reward1, reward2)
+        self.outcomes = (
+            ((reward, reward), (sucker, temptation)),
+            ((temptation, sucker), (punishment, punishment)),
+        )
+
+    @property
+    def values(self):
+        """(R, S, T, P) as a tuple"""
+        return (self.reward, self.sucker, self.temptation, self.punishment)
+
+    def payoffs(self, action1, action2):
+        """Rewards for both players given their action codes"""
+        return self.outcomes[action1][action2]
+
+    def scores(self, cc, cd, dc, dd):
+        """Total scores of both players given how often each outcome
+        (CC, CD, DC, DD from player 1's view) occurred; counts may be arrays"""
+        R, S, T, P = self.values
+        return R * cc + S * cd + T * dc + P * dd, R * cc + S * dc + T * cd + P * dd
+
+    def __repr__(self):
+        return (f"PayoffMatrix(reward={self.reward}, sucker={self.sucker}, "
+                f"temptation={self.temptation}, punishment={self.punishment}, game={self.game!r})")
+
+    @classmethod
+    def prisoners_dilemma(cls, reward=3, sucker=0, temptation=5, punishment=1):
+        return cls(reward, sucker, temptation, punishment, game='prisoners_dilemma')
+
+    @classmethod
+    def snowdrift(cls, reward=3, sucker=1, temptation=5, punishment=0):
+        return cls(reward, sucker, temptation, punishment, game='snowdrift')
+
+    @classmethod
+    def stag_hunt(cls, reward=5, sucker=0, temptation=3, punishment=1):
+        return cls(reward, sucker, temptation, punishment, game='stag_hunt')
+
+def outcome_counts(rounds, defects1, defects2, mutual_defects):
+    """(CC, CD, DC, DD) counts of a match from each player's defections
+    and the mutual ones"""
+    return (rounds - defects1 - defects2 + mutual_defects, defects2 - mutual_defects,
+            defects1 - mutual_defects, mutual_defects)
+
+# Presets
+CLASSIC = PayoffMatrix.prisoners_dilemma()
+SNOWDRIFT = PayoffMatrix.snowdrift()
+STAG_HUNT = PayoffMatrix.stag_hunt()
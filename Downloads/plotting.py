@@ -0,0 +1,100 @@
+import os
+import sys
+
+# All figures live here so the simulation engines never import
+# matplotlib; they import this module only when a plot is asked for.
+
+NON_INTERACTIVE = {'agg', 'cairo', 'pdf', 'pgf', 'ps', 'svg', 'template'}
+
+def headless():
+    """True when there is no display to open a window on (and no backend was chosen)"""
+    if os.environ.get('MPLBACKEND'):
+        return False
+    if sys.platform.startswith(('win', 'darwin')):
+        return False
+    return not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+def pyplot():
+    """matplotlib.pyplot, on the non-interactive Agg backend when running headless"""
+    if 'matplotlib.pyplot' not in sys.modules and headless():
+        import matplotlib
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def interactive():
+    return pyplot().get_backend().lower() not in NON_INTERACTIVE
+
+def show(filename):
+    """plt.show() with a window to show it in; otherwise save the figure to filename"""
+    plt = pyplot()
+    if interactive():
+        plt.show()
+    else:
+        plt.savefig(filename)
+        plt.close()
+
+def plot_results(results, player1_class, player2_class):
+    plt = pyplot()
+    labels = ['Player 1 Wins', 'Player 2 Wins', 'Draws']
+    values = [results['player1_wins'], results['player2_wins'], results['draws']]
+
+    plt.figure(figsize=(10, 5))
+    plt.bar(labels, values, color=['green', 'blue', 'orange'])
+    plt.title(f'Simulation Results: {player1_class.__name__} vs {player2_class.__name__}')
+    plt.xlabel('Outcome')
+    plt.ylabel('Frequency')
+
+    # Save the plot as an image
+    plt.savefig(f'{player1_class.__name__}_vs_{player2_class.__name__}.png')
+    plt.close()
+
+def plot_scores(players):
+    plt = pyplot()
+    names = [type(player).__name__ for player in players]
+    scores = [player.score for player in players]
+
+    plt.bar(names, scores)
+    plt.xlabel('Players')
+    plt.ylabel('Scores')
+    plt.title('Prisoner\'s Dilemma Simulation')
+    show('scores.png')
+
+def plot_average_scores(average_scores):
+    """One line per strategy name of its average score in each simulation"""
+    plt = pyplot()
+    plt.figure(figsize=(10, 6))
+    for player_class, scores in average_scores.items():
+        plt.plot(scores, label=player_class)
+
+    plt.xlabel('Simulation')
+    plt.ylabel('Average Score')
+    plt.title('Average Scores of Player Types over Simulations')
+    plt.legend()
+    show('average_scores.png')
+
+def plot_elo_ratings(players, ratings=None):
+    """Create a bar chart of final ELO ratings (or of ratings, one per player)"""
+    plt = pyplot()
+    names = [type(player).__name__ for player in players]
+    label = 'ELO Rating' if ratings is None else 'Rating'
+    if ratings is None:
+        ratings = [player.elo_rating for player in players]
+
+    plt.figure(figsize=(12, 8))
+    bars = plt.bar(names, ratings, color=['red' if 'Human' in name else 'blue' for name in names])
+
+    # Add rating values on top of bars
+    for bar, rating in zip(bars, ratings):
+        plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 5,
+                f'{rating:.0f}', ha='center', va='bottom')
+
+    plt.axhline(y=1200, color='gray', linestyle='--', alpha=0.7, label='Starting ELO (1200)')
+    plt.xlabel('Players')
+    plt.ylabel(label)
+    plt.title(f'Final {label}s - Prisoner\'s Dilemma Tournament')
+    plt.xticks(rotation=45, ha='right')
+    plt.legend()
+    plt.tight_layout()
+    plt.grid(axis='y', alpha=0.3)
+    show('elo_ratings.png')
@@ -0,0 +1,186 @@
+import inspect
+import marshal
+import sys
+import time
+import tracemalloc
+
+# Optional instrumentation of the hot paths. A Profiler installs timing
+# wrappers around play_match, play_round and every strategy's
+# choose_action / choose_batch only while it is enabled and restores the
+# originals afterwards, so nothing is slowed down when profiling is off.
+# Only calls made in this process are seen (not those of pool workers).
+
+HOOKED_FUNCTIONS = ('play_match', 'play_round')
+HOOKED_METHODS = ('choose_action', 'choose_batch')
+ENGINE_MODULES = ('strategies', 'machines', 'Games', 'tournament_dilemma', 'Nprisonersdilemma')
+
+def _match_label(args):
+    if len(args) >= 2 and not isinstance(args[0], list):
+        return f"{type(args[0]).__name__} vs {type(args[1]).__name__}"
+    if args and isinstance(args[0], list):
+        return f"{len(args[0])} players"
+    return ''
+
+class Profiler:
+    """Call counts, cumulative and own time, and allocations per hook and strategy
+
+    modules are the engine modules to instrument (by default those of
+    strategies, machines, Games, tournament_dilemma and Nprisonersdilemma
+    already imported);
+    classes adds strategy classes defined elsewhere. With allocations
+    set, tracemalloc also runs and every choose_action / choose_batch
+    call records the peak memory it allocated."""
+
+    def __init__(self, modules=None, classes=(), allocations=False):
+        if modules is None:
+            modules = [sys.modules[name] for name in ENGINE_MODULES if name in sys.modules]
+        self.modules = list(modules)
+        self.classes = list(classes)
+        self.allocations = allocations
+        # (hook, label) -> [calls, cumulative ns, own ns, allocated bytes,
+        #                  {caller: [calls, cumulative ns, own ns]}, (file, line)]
+        self.stats = {}
+        self._stack = []
+        self._patches = []
+
+    def _targets(self):
+        for module in self.modules:
+            for name in HOOKED_FUNCTIONS:
+                if inspect.isfunction(vars(module).get(name)):
+                    yield module, name, vars(module)[name], False
+            for value in list(vars(module).values()):
+                if inspect.isclass(value) and value.__module__ == module.__name__:
+                    yield from self._class_targets(value)
+        for cls in self.classes:
+            yield from self._class_targets(cls)
+
+    def _class_targets(self, cls):
+        for name in HOOKED_METHODS:
+            if name in vars(cls):
+                yield cls, name, vars(cls)[name], True
+
+    def enable(self):
+        if self._patches:
+            return self
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        wrappers = {}  # One wrapper per function, so shared batch kernels stay shared
+        for owner, name, original, method in self._targets():
+            if (owner, name) in [(o, n) for o, n, _ in self._patches]:
+                continue
+            function = original.__func__ if isinstance(original, (staticmethod, classmethod)) else original
+            if function not in wrappers:
+                wrappers[function] = self._wrap(name, original, method)
+            self._patches.append((owner, name, original))
+            setattr(owner, name, wrappers[function])
+        return self
+
+    def disable(self):
+        for owner, name, original in reversed(self._patches):
+            setattr(owner, name, original)
+        self._patches = []
+        if getattr(self, '_started_tracing', False):
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def _wrap(self, hook, original, method):
+        function = original.__func__ if isinstance(original, (staticmethod, classmethod)) else original
+        source = (function.__code__.co_filename, function.__code__.co_firstlineno)
+        stack = self._stack
+        stats = self.stats
+        perf_counter_ns = time.perf_counter_ns
+        measure_memory = self.allocations and method
+
+        def record(key, elapsed, allocated):
+            frame = stack.pop()
+            own = elapsed - frame[1]
+            parent = stack[-1][0] if stack else None
+            if stack:
+                stack[-1][1] += elapsed
+            entry = stats.get(key)
+            if entry is None:
+                entry = stats[key] = [0, 0, 0, 0, {}, source]
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] += own
+            entry[3] += allocated
+            caller = entry[4].setdefault(parent, [0, 0, 0])
+            caller[0] += 1
+            caller[1] += elapsed
+            caller[2] += own
+
+        def timed(key, args, kwargs):
+            stack.append([key, 0])
+            if measure_memory:
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            start = perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter_ns() - start
+                allocated = tracemalloc.get_traced_memory()[1] - before if measure_memory else 0
+                record(key, elapsed, allocated)
+
+        if isinstance(original, staticmethod):
+            # Batch kernels: label by the kernel itself
+            label = function.__qualname__.rsplit('.', 1)[0]
+
+            def wrapper(*args, **kwargs):
+                return timed((hook, label), args, kwargs)
+            return staticmethod(wrapper)
+        if isinstance(original, classmethod):
+            # Kernels shared by a family of classes (machines): label by the class
+            def wrapper(*args, **kwargs):
+                return timed((hook, args[0].__name__), args, kwargs)
+            return classmethod(wrapper)
+
+        def wrapper(*args, **kwargs):
+            return timed((hook, type(args[0]).__name__ if method else _match_label(args)), args, kwargs)
+        wrapper.__wrapped__ = function
+        return wrapper
+
+    def reset(self):
+        self.stats.clear()
+
+    def summary(self, limit=None, sort='cumulative'):
+        """Table of the hooks, most expensive first (sort is 'cumulative', 'own' or 'calls')"""
+        column = {'calls': 0, 'cumulative': 1, 'own': 2}[sort]
+        rows = sorted(self.stats.items(), key=lambda item: item[1][column], reverse=True)[:limit]
+        lines = [f"{'Hook':<14} {'Label':<45} {'Calls':>10} {'Cum ms':>10} {'Own ms':>10} "
+                 f"{'ns/call':>9}" + (f" {'Alloc KiB':>10}" if self.allocations else "")]
+        for (hook, label), (calls, cumulative, own, allocated, _, _) in rows:
+            line = (f"{hook:<14} {label:<45} {calls:>10} {cumulative / 1e6:>10.2f} {own / 1e6:>10.2f} "
+                    f"{cumulative / calls:>9.0f}")
+            if self.allocations:
+                line += f" {allocated / 1024:>10.1f}"
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def _function(self, key):
+        hook, label = key
+        file, line = self.stats[key][5]
+        return (file, line, f"{hook} [{label}]" if label else hook)
+
+    def pstats_data(self):
+        """The stats as a pstats.Stats-compatible dict of (file, line, name) entries"""
+        data = {}
+        for key, (calls, cumulative, own, _, callers, _) in self.stats.items():
+            # Time spent in this hook when called from each parent hook
+            caller_data = {self._function(parent): (count, count, own_ns / 1e9, cumulative_ns / 1e9)
+                           for parent, (count, cumulative_ns, own_ns) in callers.items()
+                           if parent is not None}
+            data[self._function(key)] = (calls, calls, own / 1e9, cumulative / 1e9, caller_data)
+        return data
+
+    def dump_stats(self, path):
+        """Write a file that pstats.Stats(path) can load"""
+        with open(path, 'wb') as f:
+            marshal.dump(self.pstats_data(), f)
@@ -0,0 +1,54 @@
+import zlib
+
+import numpy as np
+
+def make_rng(seed=None):
+    """Return a numpy Generator for seed (None, an int, a SeedSequence or a Generator)"""
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+def spawn(seed, n):
+    """n independent children of seed, each accepted by make_rng"""
+    if isinstance(seed, (np.random.Generator, np.random.SeedSequence)):
+        return seed.spawn(n)
+    return np.random.SeedSequence(seed).spawn(n)
+
+def keyed_child(seed, *names):
+    """Child of seed picked by names rather than by position
+
+    Unlike spawn, the child one pairing gets does not change when other
+    pairings are added or removed."""
+    if isinstance(seed, np.random.Generator):
+        root = seed.bit_generator.seed_seq
+    elif isinstance(seed, np.random.SeedSequence):
+        root = seed
+    else:
+        root = np.random.SeedSequence(seed)
+    key = tuple(zlib.crc32(name.encode()) for name in names)
+    return np.random.SeedSequence(root.entropy, spawn_key=root.spawn_key + key)
+
+class UniformStream:
+    """Per-player source of uniforms drawn from a Generator in blocks
+
+    Mirrors the random() / choice() calls strategies used to make on the
+    global random module, but pays for one Generator call per block instead
+    of one per round."""
+    __slots__ = ('generator', 'block', '_buffer', '_index')
+
+    def __init__(self, generator, block=1024):
+        self.generator = generator
+        self.block = block
+        self._buffer = []
+        self._index = 0
+
+    def random(self):
+        if self._index == len(self._buffer):
+            self._buffer = self.generator.random(self.block).tolist()
+            self._index = 0
+        value = self._buffer[self._index]
+        self._index += 1
+        return value
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
@@ -0,0 +1,182 @@
+import math
+
+import numpy as np
+
+# Ratings computed from a whole match log at once. A log is three arrays
+# of equal length: player_a and player_b (integer player indices) and
+# score (1 if a won, 0.5 for a tie, 0 if b won). Every function returns
+# one rating per player on the ELO scale.
+
+def _as_log(player_a, player_b, score, n):
+    player_a = np.asarray(player_a, dtype=np.intp)
+    player_b = np.asarray(player_b, dtype=np.intp)
+    score = np.asarray(score, dtype=np.float64)
+    if not player_a.shape == player_b.shape == score.shape or player_a.ndim != 1:
+        raise ValueError("player_a, player_b and score must be 1-D arrays of the same length")
+    if n is None:
+        n = int(max(player_a.max(initial=-1), player_b.max(initial=-1))) + 1
+    return player_a, player_b, score, n
+
+def elo(player_a, player_b, score, n=None, k_factor=32, initial=1200):
+    """Sequential ELO ratings after the whole log, played in log order
+
+    Gives exactly the ratings ELOSystem.update_ratings reaches over the
+    same matches. Every update depends on the previous one, so this is a
+    single loop over plain floats rather than over array elements."""
+    player_a, player_b, score, n = _as_log(player_a, player_b, score, n)
+    ratings = [float(initial)] * n
+    for a, b, s in zip(player_a.tolist(), player_b.tolist(), score.tolist()):
+        rating_a, rating_b = ratings[a], ratings[b]
+        expected_a = 1 / (1 + 10**((rating_b - rating_a) / 400))
+        expected_b = 1 / (1 + 10**((rating_a - rating_b) / 400))
+        ratings[a] = rating_a + k_factor * (s - expected_a)
+        ratings[b] = rating_b + k_factor * ((1 - s) - expected_b)
+    return np.array(ratings)
+
+def bradley_terry(player_a, player_b, score, n=None, initial=1200, prior=1.0, tol=1e-10, max_iter=100):
+    """Maximum-likelihood Bradley-Terry ratings; the order of the log does not matter
+
+    A tie counts as half a win for each side. prior adds that many
+    virtual ties against a fixed opponent rated `initial`, which pins the
+    scale and keeps players without a win (or without a loss) finite.
+    The log is collapsed to its distinct pairings and the likelihood is
+    maximised by Newton's method over all players' log-strengths, with a
+    dense n x n Hessian."""
+    player_a, player_b, score, n = _as_log(player_a, player_b, score, n)
+    if prior <= 0:
+        raise ValueError(f"prior must be positive, got {prior}")
+    low, high = np.minimum(player_a, player_b), np.maximum(player_a, player_b)
+    pairs, games = np.unique(low * n + high, return_counts=True)
+    pair_a, pair_b = np.divmod(pairs, n)
+    wins = np.bincount(player_a, weights=score, minlength=n) + np.bincount(player_b, weights=1 - score, minlength=n)
+    wins += prior / 2
+
+    def log_likelihood(theta):
+        return (wins @ theta - games @ np.logaddexp(theta[pair_a], theta[pair_b])
+                - prior * np.logaddexp(theta, 0).sum())
+
+    theta = np.zeros(n)  # Natural log of each player's strength
+    likelihood = log_likelihood(theta)
+    for _ in range(max_iter):
+        p = 1 / (1 + np.exp(theta[pair_b] - theta[pair_a]))  # P(a beats b)
+        p0 = 1 / (1 + np.exp(-theta))  # P(beating the virtual opponent)
+        gradient = (wins - np.bincount(pair_a, weights=games * p, minlength=n)
+                    - np.bincount(pair_b, weights=games * (1 - p), minlength=n) - prior * p0)
+        curvature = games * p * (1 - p)
+        hessian = np.zeros((n, n))
+        hessian[pair_a, pair_b] = curvature
+        hessian[pair_b, pair_a] = curvature
+        hessian[np.diag_indices(n)] = -(np.bincount(pair_a, weights=curvature, minlength=n)
+                                        + np.bincount(pair_b, weights=curvature, minlength=n)
+                                        + prior * p0 * (1 - p0))
+        step = np.linalg.solve(hessian, -gradient)
+        # Halve the step until the likelihood does not get worse
+        for _ in range(50):
+            updated = log_likelihood(theta + step)
+            if updated >= likelihood:
+                break
+            step /= 2
+        theta += step
+        likelihood = updated
+        if np.max(np.abs(step), initial=0) < tol:
+            break
+    return initial + 400 * np.log10(np.e) * theta
+
+_GLICKO_SCALE = 400 / math.log(10)  # 173.7178...
+
+def glicko2(player_a, player_b, score, n=None, period=None, initial=1200, deviation=350, volatility=0.06,
+            tau=0.5, tol=1e-6):
+    """Glicko-2 ratings, deviations and volatilities after every rating period
+
+    period gives the (non-decreasing) rating period of each match; by
+    default the whole log is one period. Within a period every player is
+    updated at once from the ratings at its start, as the system
+    prescribes. initial, deviation and volatility may also be per-player
+    arrays, to continue from earlier results. Returns (ratings,
+    deviations, volatilities)."""
+    player_a, player_b, score, n = _as_log(player_a, player_b, score, n)
+    mu = (np.broadcast_to(np.asarray(initial, dtype=np.float64), n) - 1500) / _GLICKO_SCALE
+    phi = np.broadcast_to(np.asarray(deviation, dtype=np.float64), n) / _GLICKO_SCALE
+    sigma = np.broadcast_to(np.asarray(volatility, dtype=np.float64), n).copy()
+
+    if period is None:
+        bounds = [0, len(score)]
+    else:
+        period = np.asarray(period)
+        if period.shape != score.shape or np.any(np.diff(period) < 0):
+            raise ValueError("period must give a non-decreasing period for every match")
+        bounds = np.concatenate(([0], np.flatnonzero(np.diff(period)) + 1, [len(score)]))
+
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        # Both sides of every match, seen from the player being rated
+        player = np.concatenate((player_a[start:stop], player_b[start:stop]))
+        opponent = np.concatenate((player_b[start:stop], player_a[start:stop]))
+        result = np.concatenate((score[start:stop], 1 - score[start:stop]))
+
+        g = 1 / np.sqrt(1 + 3 * phi[opponent]**2 / math.pi**2)
+        expected = 1 / (1 + np.exp(-g * (mu[player] - mu[opponent])))
+        information = np.bincount(player, weights=g**2 * expected * (1 - expected), minlength=n)
+        improvement = np.bincount(player, weights=g * (result - expected), minlength=n)
+
+        played = information > 0
+        v = 1 / information[played]
+        delta = v * improvement[played]
+        new_sigma = _glicko2_volatility(delta, phi[played], v, sigma[played], tau, tol)
+
+        # Players without a game only grow more uncertain
+        phi_star = np.sqrt(phi**2 + sigma**2)
+        phi_star[played] = np.sqrt(phi[played]**2 + new_sigma**2)
+        sigma[played] = new_sigma
+        phi = np.where(played, 1 / np.sqrt(1 / np.where(played, phi_star, 1)**2 + information), phi_star)
+        mu = mu + np.where(played, phi**2 * improvement, 0)
+
+    return 1500 + _GLICKO_SCALE * mu, _GLICKO_SCALE * phi, sigma
+
+def _glicko2_volatility(delta, phi, v, sigma, tau, tol):
+    # Step 5 of Glickman's Glicko-2 description (Illinois algorithm),
+    # run for all players at once
+    a = np.log(sigma**2)
+
+    def f(x):
+        ex = np.exp(x)
+        return ex * (delta**2 - phi**2 - v - ex) / (2 * (phi**2 + v + ex)**2) - (x - a) / tau**2
+
+    A = a.copy()
+    big = delta**2 > phi**2 + v
+    B = np.where(big, np.log(np.maximum(delta**2 - phi**2 - v, np.finfo(float).tiny)), a - tau)
+    fB = f(B)
+    # Without a big improvement, step down until f changes sign
+    k = 1
+    while True:
+        search = ~big & (fB < 0)
+        if not search.any():
+            break
+        k += 1
+        B = np.where(search, a - k * tau, B)
+        fB = f(B)
+    fA = f(A)
+    while True:  # Lanes that have converged are left as they are
+        active = np.abs(B - A) > tol
+        if not active.any():
+            break
+        with np.errstate(divide='ignore', invalid='ignore'):
+            C = A + (A - B) * fA / (fB - fA)
+        fC = f(C)
+        flip = fC * fB <= 0
+        A = np.where(active, np.where(flip, B, A), A)
+        fA = np.where(active, np.where(flip, fB, fA / 2), fA)
+        B = np.where(active, C, B)
+        fB = np.where(active, fC, fB)
+    return np.exp(A / 2)
+
+RATINGS = {
+    'elo': elo,
+    'bradley_terry': bradley_terry,
+    'glicko2': lambda *log, **kwargs: glicko2(*log, **kwargs)[0],
+}
+
+def rate(player_a, player_b, score, method='elo', **kwargs):
+    """Ratings from one of RATINGS ('elo', 'bradley_terry' or 'glicko2')"""
+    if method not in RATINGS:
+        raise ValueError(f"Unknown rating method {method!r}, expected one of {sorted(RATINGS)}")
+    return RATINGS[method](player_a, player_b, score, **kwargs)
@@ -0,0 +1,181 @@
+import json
+import os
+
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Round-by-round match traces. A log is a directory holding one row per
+# round played, with the columns below, plus meta.json describing every
+# match (who played, and how many identical replicates a row stands for).
+COLUMNS = (
+    ('match', np.int64),
+    ('round', np.int32),
+    ('action1', np.uint8),  # Action values: 0 = COOPERATE, 1 = DEFECT
+    ('action2', np.uint8),
+    ('payoff1', np.float32),
+    ('payoff2', np.float32),
+)
+FORMATS = ('memmap', 'npz', 'parquet')
+
+class MatchRecorder:
+    """Streams per-round actions and payoffs to disk in bounded chunks
+
+    format is 'memmap' (one raw column file per column, read back as
+    np.memmap), 'npz' (one compressed file per chunk) or 'parquet'
+    (needs pyarrow). At most chunk rows are held in memory at a time."""
+
+    def __init__(self, path, format='memmap', chunk=1 << 16):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format {format!r}, expected one of {FORMATS}")
+        if format == 'parquet' and pyarrow is None:
+            raise ValueError("The parquet format needs pyarrow")
+        self.path = path
+        self.format = format
+        self.chunk = chunk
+        self.rows = 0
+        self.matches = []
+        self._pending = []  # Rows from record(), as tuples
+        self._chunks = 0
+        self._writer = None
+        os.makedirs(path, exist_ok=True)
+        if format == 'memmap':
+            for name, _ in COLUMNS:
+                open(os.path.join(path, f"{name}.bin"), 'wb').close()
+
+    def new_match(self, player1, player2, copies=1):
+        """Register a match and return its id; copies counts identical replicates it stands for"""
+        self.matches.append({'player1': player1, 'player2': player2, 'copies': copies})
+        return len(self.matches) - 1
+
+    def record(self, match, round, action1, action2, payoff1, payoff2):
+        self._pending.append((match, round, action1, action2, payoff1, payoff2))
+        if len(self._pending) >= self.chunk:
+            self._flush_pending()
+
+    def record_block(self, matches, first_round, actions1, actions2, payoff):
+        """Record consecutive rounds of many matches at once
+
+        actions1 and actions2 are (rounds, len(matches)) arrays (True or 1
+        meaning DEFECT); the payoffs are looked up in payoff.matrix."""
+        self._flush_pending()
+        actions1 = np.asarray(actions1, dtype=np.uint8)
+        actions2 = np.asarray(actions2, dtype=np.uint8)
+        rounds, lanes = actions1.shape
+        if not lanes:
+            return
+        step = max(1, self.chunk // lanes)
+        for start in range(0, rounds, step):
+            a1 = actions1[start:start + step].ravel()
+            a2 = actions2[start:start + step].ravel()
+            size = len(a1) // lanes
+            self._write({
+                'match': np.tile(np.asarray(matches, dtype=np.int64), size),
+                'round': np.repeat(np.arange(first_round + start, first_round + start + size, dtype=np.int32), lanes),
+                'action1': a1,
+                'action2': a2,
+                'payoff1': payoff.matrix[a1, a2].astype(np.float32),
+                'payoff2': payoff.matrix[a2, a1].astype(np.float32),
+            })
+
+    def _flush_pending(self):
+        if self._pending:
+            columns = zip(*self._pending)
+            self._write({name: np.array(values, dtype=dtype) for (name, dtype), values in zip(COLUMNS, columns)})
+            self._pending = []
+
+    def _write(self, columns):
+        if self.format == 'memmap':
+            for name, dtype in COLUMNS:
+                with open(os.path.join(self.path, f"{name}.bin"), 'ab') as f:
+                    f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        elif self.format == 'npz':
+            np.savez_compressed(os.path.join(self.path, f"chunk-{self._chunks:06d}.npz"), **columns)
+        else:
+            table = pyarrow.table({name: columns[name].astype(dtype) for name, dtype in COLUMNS})
+            if self._writer is None:
+                self._writer = pyarrow.parquet.ParquetWriter(os.path.join(self.path, "log.parquet"), table.schema)
+            self._writer.write_table(table)
+        self._chunks += 1
+        self.rows += len(columns['match'])
+
+    def flush(self):
+        """Write pending rows and the match descriptions"""
+        self._flush_pending()
+        meta = {'format': self.format, 'rows': self.rows, 'chunks': self._chunks,
+                'columns': {name: np.dtype(dtype).str for name, dtype in COLUMNS}, 'matches': self.matches}
+        temporary = os.path.join(self.path, "meta.json.tmp")
+        with open(temporary, 'w') as f:
+            json.dump(meta, f)
+        os.replace(temporary, os.path.join(self.path, "meta.json"))
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class MatchLog:
+    """Lazy reader for a directory written by MatchRecorder"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.format = meta['format']
+        self.rows = meta['rows']
+        self.matches = meta['matches']
+        self._chunks = meta['chunks']
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        """One whole column; memory-mapped (not loaded) for the memmap format"""
+        if self.format == 'memmap':
+            dtype = dict(COLUMNS)[name]
+            if not self.rows:
+                return np.empty(0, dtype=dtype)
+            return np.memmap(os.path.join(self.path, f"{name}.bin"), dtype=dtype, mode='r', shape=(self.rows,))
+        return np.concatenate([chunk[name] for chunk in self.chunks(columns=[name])] or
+                              [np.empty(0, dtype=dict(COLUMNS)[name])])
+
+    def chunks(self, columns=None, size=1 << 20):
+        """Iterate over the log as dicts of column arrays, one chunk at a time"""
+        names = [name for name, _ in COLUMNS] if columns is None else list(columns)
+        if self.format == 'memmap':
+            mapped = {name: self.column(name) for name in names}
+            for start in range(0, self.rows, size):
+                yield {name: np.asarray(column[start:start + size]) for name, column in mapped.items()}
+        elif self.format == 'npz':
+            for k in range(self._chunks):
+                with np.load(os.path.join(self.path, f"chunk-{k:06d}.npz")) as chunk:
+                    yield {name: chunk[name] for name in names}
+        else:
+            if pyarrow is None:
+                raise ValueError("Reading a parquet log needs pyarrow")
+            parquet = pyarrow.parquet.ParquetFile(os.path.join(self.path, "log.parquet"))
+            for batch in parquet.iter_batches(batch_size=size, columns=names):
+                yield {name: batch.column(name).to_numpy() for name in names}
+
+    def match(self, match):
+        """All rows of one match, in round order"""
+        parts = []
+        for chunk in self.chunks():
+            keep = chunk['match'] == match
+            if keep.any():
+                parts.append({name: values[keep] for name, values in chunk.items()})
+        rows = {name: np.concatenate([part[name] for part in parts]) if parts else np.empty(0, dtype=dtype)
+                for name, dtype in COLUMNS}
+        order = np.argsort(rows['round'], kind='stable')
+        return {name: values[order] for name, values in rows.items()}
@@ -0,0 +1,228 @@
+import json
+import sys
+import time
+from collections import defaultdict
+
+# Engines describe what happens as events: a name plus keyword fields.
+# They only build an event when reporter.listening is true, so a silent
+# run pays for neither the fields nor any formatting.
+#
+# run_tournament emits tournament_start(players, matches_per_pair, total),
+# match_start(match, total, game, player1, player2), match(... the same
+# plus score, score1, score2, elo1, elo2) and tournament_end(). Games.run_sweep
+# emits sweep_start(total), pairing(player1, player2, results) and
+# sweep_end(), and genetic.search search_start(total, population,
+# opponents), generation(generation, total, best, mean, evaluations) and
+# search_end().
+
+class Reporter:
+    """Silent reporter; subclasses override emit"""
+    listening = False
+
+    def emit(self, event, **fields):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class _Buffered(Reporter):
+    # Collects output lines and writes them in one go every `lines` lines
+    # or `interval` seconds, whichever comes first.
+
+    def __init__(self, stream=None, lines=256, interval=1.0):
+        self.stream = stream
+        self.lines = lines
+        self.interval = interval
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def write(self, line):
+        self._buffer.append(line)
+        if len(self._buffer) >= self.lines or time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            stream = self.stream or sys.stdout
+            stream.write('\n'.join(self._buffer) + '\n')
+            stream.flush()
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+class TextReporter(_Buffered):
+    """The classic human-readable output, buffered"""
+    listening = True
+
+    def emit(self, event, **fields):
+        if event == 'tournament_start':
+            self.write("\n=== Starting Tournament ===")
+            self.write(f"Players: {fields['players']}")
+            self.write(f"Matches per pair: {fields['matches_per_pair']}")
+        elif event == 'match_start':
+            self.write(f"\nMatch {fields['match']}/{fields['total']}: "
+                       f"{fields['player1']} vs {fields['player2']} "
+                       f"(Game {fields['game']})")
+        elif event == 'match':
+            self.write(f"Result: {fields['player1']} {fields['score1']} - "
+                       f"{fields['score2']} {fields['player2']}")
+            self.write(f"ELO Ratings: {fields['player1']}: {fields['elo1']:.1f}, "
+                       f"{fields['player2']}: {fields['elo2']:.1f}")
+        elif event == 'pairing':
+            results = fields['results']
+            self.write(f"{fields['player1']} vs {fields['player2']}:")
+            self.write(f"Player 1 wins: {results['player1_wins']}, Player 2 wins: {results['player2_wins']}, Draws: {results['draws']}")
+            self.write(f"Player 1 average score: {results['player1_average_score']}, Player 2 average score: {results['player2_average_score']}")
+            if 'precision' in results:
+                self.write(f"Simulations: {results['simulations']}, precision: {results['precision']:.4g}")
+            self.write("")
+        elif event == 'search_start':
+            self.write(f"\n=== Genetic search: population {fields['population']} "
+                       f"against {', '.join(fields['opponents'])} ===")
+        elif event == 'generation':
+            self.write(f"Generation {fields['generation']}/{fields['total']}: best {fields['best']:.4f}, "
+                       f"mean {fields['mean']:.4f} ({fields['evaluations']} genomes scored)")
+
+class JSONLinesReporter(_Buffered):
+    """One JSON object per event: {"event": name, **fields}"""
+    listening = True
+
+    def __init__(self, stream=None, lines=1024, interval=1.0):
+        # stream may also be a path, opened for appending
+        self._owned = isinstance(stream, str)
+        super().__init__(open(stream, 'a') if self._owned else stream, lines, interval)
+
+    def emit(self, event, **fields):
+        self.write(json.dumps(dict(event=event, **fields), default=_to_json))
+
+    def close(self):
+        super().close()
+        if self._owned:
+            self.stream.close()
+
+def _to_json(value):
+    # numpy scalars and anything else json does not know
+    return value.item() if hasattr(value, 'item') else str(value)
+
+class ProgressReporter(Reporter):
+    """A single progress bar line, redrawn at most every `interval` seconds"""
+    listening = True
+
+    def __init__(self, stream=None, width=40, interval=0.1):
+        self.stream = stream
+        self.width = width
+        self.interval = interval
+        self.total = 0
+        self.done = 0
+        self._last_draw = 0.0
+
+    def emit(self, event, **fields):
+        if event in ('tournament_start', 'sweep_start', 'search_start'):
+            self.total, self.done = fields['total'], 0
+            self._draw()
+        elif event in ('match', 'pairing', 'generation'):
+            self.done += 1
+            if time.monotonic() - self._last_draw >= self.interval:
+                self._draw()
+        elif event in ('tournament_end', 'sweep_end', 'search_end'):
+            self._draw()
+            (self.stream or sys.stderr).write('\n')
+
+    def _draw(self):
+        filled = self.width * self.done // self.total if self.total else self.width
+        stream = self.stream or sys.stderr
+        stream.write(f"\r[{'#' * filled}{'.' * (self.width - filled)}] {self.done}/{self.total}")
+        stream.flush()
+        self._last_draw = time.monotonic()
+
+class Standings(Reporter):
+    """Running results and ELO ratings rebuilt from match events
+
+    results has the layout run_tournament returns and ratings maps each
+    name to its latest ELO rating, so both can go to display_rankings."""
+    listening = True
+
+    def __init__(self):
+        self.results = defaultdict(lambda: {'wins': 0, 'losses': 0, 'ties': 0, 'total_score': 0})
+        self.ratings = {}
+
+    def emit(self, event, **fields):
+        if event != 'match':
+            return
+        name1, name2, score = fields['player1'], fields['player2'], fields['score']
+        self.results[name1]['total_score'] += fields['score1']
+        self.results[name2]['total_score'] += fields['score2']
+        if score == 1.0:
+            self.results[name1]['wins'] += 1
+            self.results[name2]['losses'] += 1
+        elif score == 0.0:
+            self.results[name2]['wins'] += 1
+            self.results[name1]['losses'] += 1
+        else:
+            self.results[name1]['ties'] += 1
+            self.results[name2]['ties'] += 1
+        self.ratings[name1] = fields['elo1']
+        self.ratings[name2] = fields['elo2']
+
+    def player_ratings(self, players, initial=1200):
+        """Latest rating of each player, in the order of players"""
+        return [self.ratings.get(type(player).__name__, initial) for player in players]
+
+class Dashboard(Standings):
+    """Live bar chart of the ELO ratings, redrawn at most every `interval` seconds"""
+
+    def __init__(self, interval=0.5):
+        super().__init__()
+        self.interval = interval
+        self._last_draw = 0.0
+        self._axes = None
+
+    def emit(self, event, **fields):
+        super().emit(event, **fields)
+        if event == 'tournament_end' or (event == 'match'
+                                         and time.monotonic() - self._last_draw >= self.interval):
+            self._draw()
+
+    def _draw(self):
+        import plotting
+
+        if not plotting.interactive():
+            return  # Nowhere to show it
+        plt = plotting.pyplot()
+        if self._axes is None:
+            plt.ion()
+            self._axes = plt.figure(figsize=(12, 6)).gca()
+        self._axes.clear()
+        self._axes.bar(list(self.ratings), list(self.ratings.values()), color='blue')
+        self._axes.axhline(y=1200, color='gray', linestyle='--', alpha=0.7)
+        self._axes.set_ylabel('ELO Rating')
+        self._axes.tick_params(axis='x', labelrotation=45)
+        plt.pause(0.001)
+        self._last_draw = time.monotonic()
+
+class Tee(Reporter):
+    """Send every event to several reporters"""
+
+    def __init__(self, *reporters):
+        self.reporters = [reporter for reporter in reporters if reporter.listening]
+        self.listening = bool(self.reporters)
+
+    def emit(self, event, **fields):
+        for reporter in self.reporters:
+            reporter.emit(event, **fields)
+
+    def flush(self):
+        for reporter in self.reporters:
+            reporter.flush()
+
+    def close(self):
+        for reporter in self.reporters:
+            reporter.close()
@@ -0,0 +1,316 @@
+import numpy as np
+from actions import COOPERATE, DEFECT, ACTIONS
+from randomness import UniformStream, make_rng
+
+# The strategy library shared by Games, tournament_dilemma and
+# Nprisonersdilemma. Every player decides once per round from its
+# opponents' actions in the previous round: choose_action(opponents) gets
+# a list (a single element in a two-player match), and last_action is None
+# before the first round.
+#
+# Each strategy declares, next to its choose_action:
+#
+#     deterministic  True if its play never depends on random draws
+#     memory_depth   how many past rounds its choice depends on (0 for
+#                    constant or random play, inf for unbounded memory)
+#     memory_one     (p_cc, p_cd, p_dc, p_dd, p_first) against a single
+#                    opponent, if it is memory-one (see memory_one.py)
+#     choose_batch   its vectorized kernel, if it has one
+#
+# choose_batch(state, cooperators, defectors, degree, uniforms) returns
+# the moves of a group of agents as a bool array, or one bool for all of
+# them (True meaning DEFECT), given how many of each agent's opponents
+# cooperated/defected last round (both zero in the first round) and how
+# many opponents it has; a two-player match is the case degree == 1.
+# init_batch_state(n) makes the kernel's state for n agents, and
+# strategies with batch_random set receive one uniform per agent per round.
+# Kernels of strategies with batch_own_moves set also get a sixth argument,
+# own: each agent's own move last round as actually played (after any
+# execution noise), which a kernel cannot tell from what it chose.
+
+STRATEGIES = {}
+
+def register(player_class):
+    """Class decorator adding a strategy to STRATEGIES under its name"""
+    name = player_class.__name__.removesuffix('Player')
+    if name in STRATEGIES and STRATEGIES[name] is not player_class:
+        raise ValueError(f"A strategy named {name!r} is already registered")
+    STRATEGIES[name] = player_class
+    return player_class
+
+def lookup(name):
+    """The registered strategy called name ('TitForTat' or 'TitForTatPlayer')"""
+    player_class = STRATEGIES.get(name.removesuffix('Player'))
+    if player_class is None:
+        raise ValueError(f"Unknown strategy {name!r}, expected one of {sorted(STRATEGIES)}")
+    return player_class
+
+def declared(player_class, name, default=None):
+    """Class attribute name as declared next to player_class's choose_action
+
+    Metadata only describes the choose_action defined alongside it, so a
+    subclass that overrides choose_action alone declares nothing."""
+    for klass in player_class.__mro__:
+        if 'choose_action' in vars(klass):
+            return vars(klass).get(name, default)
+    return default
+
+def has_kernel(player_class):
+    """Whether player_class has a choose_batch matching its choose_action"""
+    return declared(player_class, 'choose_batch') is not None
+
+def metadata(player_class):
+    return {
+        'name': player_class.__name__,
+        'deterministic': bool(declared(player_class, 'deterministic', False)),
+        'memory_depth': declared(player_class, 'memory_depth'),
+        'memory_one': declared(player_class, 'memory_one'),
+        'kernel': has_kernel(player_class),
+        'batch_random': player_class.batch_random,
+        'batch_own_moves': player_class.batch_own_moves,
+    }
+
+class Player:
+    __slots__ = ('last_action', 'score', 'elo_rating', '_seed', '_rng')
+    batch_random = False
+    batch_own_moves = False
+
+    def __init__(self, rng=None):
+        self.elo_rating = 1200  # Starting ELO rating
+        self.seed(rng)
+        self.reset()
+
+    @property
+    def rng(self):
+        """This player's own random source, built on its first draw so
+        strategies that never draw cost no Generator"""
+        if self._rng is None:
+            self._rng = UniformStream(make_rng(self._seed))
+            self._seed = None
+        return self._rng
+
+    def reset(self):
+        """Forget the previous match: score, last action and strategy state
+
+        Strategies that keep state extend this."""
+        self.last_action = None
+        self.score = 0
+
+    def update_score(self, reward):
+        self.score += reward
+
+    def reset_score(self):
+        self.score = 0
+
+    def seed(self, rng):
+        """Replace this player's random source (seed, SeedSequence or Generator)"""
+        self._seed = rng
+        self._rng = None
+
+    @staticmethod
+    def init_batch_state(n):
+        return None
+
+@register
+class TitForTatPlayer(Player):
+    __slots__ = ()
+    deterministic = True
+    memory_depth = 1
+    memory_one = (1, 0, 1, 0, 1)
+
+    def choose_action(self, opponents):
+        for opponent in opponents:
+            if opponent.last_action == DEFECT:
+                return DEFECT
+        return COOPERATE
+
+    @staticmethod
+    def choose_batch(state, cooperators, defectors, degree, uniforms):
+        return defectors > 0
+
+@register
+class TitForTatMixedPlayer(Player):
+    __slots__ = ()
+    deterministic = True
+    memory_depth = 1
+    memory_one = (1, 0, 1, 0, 1)  # Against a single opponent
+
+    def choose_action(self, opponents):
+        n_defect = 0
+        n_cooperate = 0
+        for opponent in opponents:
+            if opponent.last_action == DEFECT:
+                n_defect += 1
+            elif opponent.last_action == COOPERATE:
+                n_cooperate += 1
+        if n_cooperate >= n_defect:
+            return COOPERATE
+        else:
+            return DEFECT
+
+    @staticmethod
+    def choose_batch(state, cooperators, defectors, degree, uniforms):
+        return defectors > cooperators
+
+@register
+class RandomPlayer(Player):
+    __slots__ = ()
+    deterministic = False
+    memory_depth = 0
+    memory_one = (0.5, 0.5, 0.5, 0.5, 0.5)
+    batch_random = True
+
+    def choose_action(self, opponents):
+        return self.rng.choice(ACTIONS)
+
+    @staticmethod
+    def choose_batch(state, cooperators, defectors, degree, uniforms):
+        return uniforms < 0.5
+
+@register
+class GrimTriggerPlayer(Player):
+    __slots__ = ('triggered',)
+    deterministic = True
+    # Once triggered it defects, so its own last move was D; that makes it
+    # memory-one: cooperate only after mutual cooperation.
+    memory_depth = 1
+    memory_one = (1, 0, 0, 0, 1)
+
+    def reset(self):
+        super().reset()
+        self.triggered = False
+
+    def choose_action(self, opponents):
+        if any(opponent.last_action == DEFECT for opponent in opponents):
+            self.triggered = True
+        return DEFECT if self.triggered else COOPERATE
+
+    @staticmethod
+    def init_batch_state(n):
+        return np.zeros(n, dtype=bool)
+
+    @staticmethod
+    def choose_batch(state, cooperators, defectors, degree, uniforms):
+        state |= defectors > 0
+        return state
+
+@register
+class GrimTriggerMixPlayer(Player):
+    __slots__ = ('triggered', 'defect_count')
+    deterministic = True
+    memory_depth = float('inf')  # Counts every defection seen
+    limit = 3
+
+    def reset(self):
+        super().reset()
+        self.triggered = False
+        self.defect_count = 0
+
+    def choose_action(self, opponents):
+        for opponent in opponents:
+            if opponent.last_action == DEFECT:
+                self.defect_count += 1
+        if self.defect_count >= self.limit:
+            self.triggered = True
+        return DEFECT if self.triggered else COOPERATE
+
+    # State is the running count of defections seen from opponents
+    @staticmethod
+    def init_batch_state(n):
+        return np.zeros(n)
+
+    @staticmethod
+    def choose_batch(state, cooperators, defectors, degree, uniforms):
+        state += defectors
+        return state >= GrimTriggerMixPlayer.limit
+
+@register
+class ForgivingTitForTatPlayer(Player):
+    __slots__ = ()
+    deterministic = True
+    memory_depth = 1
+    memory_one = (1, 0, 1, 0, 1)  # Against a single opponent
+
+    def choose_action(self, opponents):
+        n = len(opponents)
+        cooperate_count = sum(1 for opponent in opponents if opponent.last_action == COOPERATE)
+        if cooperate_count > n / 5:
+            return COOPERATE
+        elif any(opponent.last_action == DEFECT for opponent in opponents):
+            return DEFECT
+        return COOPERATE
+
+    @staticmethod
+    def choose_batch(state, cooperators, defectors, degree, uniforms):
+        return (cooperators <= degree / 5) & (defectors > 0)
+
+@register
+class GenerousTitForTatPlayer(Player):
+    __slots__ = ()
+    deterministic = False
+    memory_depth = 1
+    memory_one = (1, 0.5, 1, 0.5, 1)
+    batch_random = True
+
+    def choose_action(self, opponents):
+        # Tit for tat that forgives a defection half the time
+        if any(opponent.last_action == DEFECT for opponent in opponents):
+            return COOPERATE if self.rng.random() < 0.5 else DEFECT
+        return COOPERATE
+
+    @staticmethod
+    def choose_batch(state, cooperators, defectors, degree, uniforms):
+        return (defectors > 0) & (uniforms >= 0.5)
+
+@register
+class RuthlessTitForTatPlayer(Player):
+    __slots__ = ()
+    deterministic = False
+    memory_depth = 1
+    memory_one = (0, 0, 0, 0, 0.5)  # Against a single opponent
+    batch_random = True
+
+    def choose_action(self, opponents):
+        n = len(opponents)
+        cooperate_count = sum(1 for opponent in opponents if opponent.last_action == COOPERATE)
+        if cooperate_count > n / 5:
+            return DEFECT
+        elif any(opponent.last_action == DEFECT for opponent in opponents):
+            return DEFECT
+        return self.rng.choice(ACTIONS)
+
+    @staticmethod
+    def choose_batch(state, cooperators, defectors, degree, uniforms):
+        return (cooperators > degree / 5) | (defectors > 0) | (uniforms < 0.5)
+
+@register
+class SuperForgivingPlayer(Player):
+    __slots__ = ()
+    deterministic = True
+    memory_depth = 0
+    memory_one = (1, 1, 1, 1, 1)
+
+    def choose_action(self, opponents):
+        return COOPERATE
+
+    @staticmethod
+    def choose_batch(state, cooperators, defectors, degree, uniforms):
+        return False
+
+@register
+class SuperUnforgivingPlayer(Player):
+    __slots__ = ()
+    deterministic = True
+    memory_depth = 0
+    memory_one = (0, 0, 0, 0, 0)
+
+    def choose_action(self, opponents):
+        return DEFECT
+
+    @staticmethod
+    def choose_batch(state, cooperators, defectors, degree, uniforms):
+        return True
+
+# Old names
+TitForTatPlayeMixed = TitForTatMixedPlayer
+SuperUnForgivingPlayer = SuperUnforgivingPlayer
@@ -0,0 +1,24 @@
+import pytest
+
+from benchmarks import SUITES, Case, case_key, compare, time_case
+
+@pytest.mark.parametrize('suite', sorted(SUITES))
+def test_quick_suites_build_distinct_cases(suite):
+    cases = list(SUITES[suite](True))
+    assert cases
+    keys = [case_key({'name': case.name, 'params': case.params}) for case in cases]
+    assert len(set(keys)) == len(keys)
+    cases[0].run()
+
+def test_time_case_reports_rates():
+    calls = []
+    result = time_case(Case('noop', {'n': 1}, lambda: calls.append(1), work=10, unit='items'), repeat=3)
+    assert len(calls) == 1 + 3 + 1  # Warm-up, timed repeats, tracemalloc run
+    assert len(result['times']) == 3 and result['best'] <= result['median']
+    assert result['rate'] == 10 / result['median'] and result['unit'] == 'items/s'
+
+def test_compare_flags_cases_slower_than_the_threshold():
+    def run(**medians):
+        return [{'name': name, 'params': {}, 'median': median} for name, median in medians.items()]
+    baseline = {'benchmarks': run(steady=1.0, slower=1.0)}
+    assert compare(run(steady=1.1, slower=1.5, new=9.0), baseline, 1.25) == ['slower']
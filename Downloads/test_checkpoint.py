@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+import Games
+from checkpoint import Checkpoint
+from reporting import Reporter
+from tournament_dilemma import GrimTriggerPlayer, RandomPlayer, TitForTatPlayer, TitForTatMixedPlayer, run_tournament
+
+PLAYERS = [TitForTatPlayer, RandomPlayer, GrimTriggerPlayer, TitForTatMixedPlayer]
+
+class Interrupt(Exception):
+    pass
+
+class StopAfter(Reporter):
+    """Raises Interrupt at the given event's count-th occurrence"""
+    listening = True
+
+    def __init__(self, event, count):
+        self.event = event
+        self.count = count
+
+    def emit(self, event, **fields):
+        if event == self.event:
+            self.count -= 1
+            if not self.count:
+                raise Interrupt
+
+def standings(players, results):
+    return [(type(player).__name__, player.elo_rating) for player in players], dict(results)
+
+def interrupted_then_resumed(path, run, event, count, tear=0):
+    with pytest.raises(Interrupt):
+        with Checkpoint(path, every=2, interval=0) as checkpoint:
+            run(checkpoint, StopAfter(event, count))
+    if tear:
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - tear)  # A frame cut short by a crash
+    with Checkpoint(path, every=2, interval=0) as checkpoint:
+        return run(checkpoint, Reporter())
+
+@pytest.mark.parametrize('workers, tear', [(1, 0), (1, 3), (2, 0)])
+def test_resumed_tournament_equals_uninterrupted(tmp_path, workers, tear):
+    def run(checkpoint, reporter):
+        return standings(*run_tournament(PLAYERS, matches_per_pair=3, seed=11, workers=workers,
+                                         reporter=reporter, checkpoint=checkpoint))
+    expected = run(None, Reporter())
+    assert interrupted_then_resumed(str(tmp_path / 'log'), run, 'match', 7, tear) == expected
+
+def test_resumed_sweep_equals_uninterrupted(tmp_path):
+    def run(checkpoint, reporter):
+        sweep = Games.run_sweep(PLAYERS, 50, 6, seed=4, checkpoint=checkpoint, reporter=reporter)
+        return [(p1.__name__, p2.__name__, result) for p1, p2, result in sweep]
+    expected = run(None, Reporter())
+    assert interrupted_then_resumed(str(tmp_path / 'log'), run, 'pairing', 5) == expected
+
+def test_checkpoint_of_another_run_is_refused(tmp_path):
+    path = str(tmp_path / 'log')
+    with Checkpoint(path) as checkpoint:
+        Games.run_sweep(PLAYERS, 50, 6, seed=4, checkpoint=checkpoint)
+    with pytest.raises(ValueError):
+        with Checkpoint(path) as checkpoint:
+            Games.run_sweep(PLAYERS, 60, 6, seed=4, checkpoint=checkpoint)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from equilibria import (exploitability, fictitious_play, lemke_howson, regret_matching, solve,
+                        support_enumeration)
+
+ROCK_PAPER_SCISSORS = [[0, -1, 1], [1, 0, -1], [-1, 1, 0]]
+HAWK_DOVE = [[-1, 2], [0, 1]]  # V = 2, C = 4: Hawk with probability V / C
+PRISONERS_DILEMMA = [[3, 0], [5, 1]]
+
+@pytest.mark.parametrize('A, expected', [
+    (ROCK_PAPER_SCISSORS, [1 / 3, 1 / 3, 1 / 3]),
+    (HAWK_DOVE, [0.5, 0.5]),
+    (PRISONERS_DILEMMA, [0, 1]),
+])
+@pytest.mark.parametrize('method', ['support_enumeration', 'lemke_howson', 'auto'])
+def test_exact_solvers_find_the_known_equilibrium(A, expected, method):
+    assert solve(A, method) == pytest.approx(expected)
+
+def test_support_enumeration_finds_every_equilibrium():
+    # Coordination: both pure profiles and the mix (2/3, 1/3)
+    found = sorted(support_enumeration([[1, 0], [0, 2]]), key=lambda x: x[0])
+    assert np.array(found) == pytest.approx(np.array([[0, 1], [2 / 3, 1 / 3], [1, 0]]))
+
+@pytest.mark.parametrize('solver, bound', [(fictitious_play, 1e-2), (regret_matching, 1e-3)])
+def test_iterative_solvers_approach_zero_sum_equilibria(solver, bound):
+    assert exploitability(ROCK_PAPER_SCISSORS, solver(ROCK_PAPER_SCISSORS)) <= bound
+
+def test_auto_on_large_games():
+    rng = np.random.default_rng(0)
+    A = rng.normal(size=(40, 40))
+    assert exploitability(A, solve(A)) == pytest.approx(0, abs=1e-9)
+    zero_sum = A - A.T  # Goes to fictitious play, an approximation
+    assert exploitability(zero_sum, solve(zero_sum)) <= 2e-2
+    with pytest.raises(ValueError):
+        lemke_howson(A, max_pivots=1)
+
+def test_solve_rejects_unknown_methods_and_options():
+    with pytest.raises(ValueError):
+        solve(HAWK_DOVE, 'simplex')
+    with pytest.raises(ValueError):
+        solve(HAWK_DOVE, 'auto', tol=1e-3)
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from evolution import fixation_probabilities, moran, replicator
+
+# Hawk-Dove with V = 2, C = 4: the mixed equilibrium plays Hawk with V / C
+HAWK_DOVE = [[-1, 2], [0, 1]]
+PRISONERS_DILEMMA = [[3, 0], [5, 1]]
+
+@pytest.mark.parametrize('method', ['continuous', 'discrete'])
+def test_replicator_reaches_the_hawk_dove_equilibrium(method):
+    trajectory = replicator(HAWK_DOVE, [0.9, 0.1], 2000, dt=0.05, method=method)
+    assert trajectory[-1] == pytest.approx([0.5, 0.5], abs=1e-3)
+
+def test_replicator_takes_defection_to_fixation():
+    assert replicator(PRISONERS_DILEMMA, [0.99, 0.01], 2000, dt=0.05)[-1, 1] > 0.999
+
+def test_fixation_probabilities_closed_forms():
+    size = 10
+    assert fixation_probabilities(np.ones((3, 3)), size) == pytest.approx(np.full((3, 3), 1 / size))
+    # Constant fitness advantage r = exp(intensity * (a - b)):
+    # rho = (1 - 1 / r) / (1 - 1 / r ** size)
+    a, b, intensity = 1.5, 1.0, 0.8
+    r = np.exp(intensity * (a - b))
+    rho = fixation_probabilities([[a, a], [b, b]], size, intensity)
+    assert rho[0, 1] == pytest.approx((1 - 1 / r) / (1 - 1 / r ** size))
+    assert rho[1, 0] == pytest.approx((1 - r) / (1 - r ** size))
+
+def test_moran_fixates_as_often_as_the_closed_form():
+    size, replicates = 8, 5000
+    rho = fixation_probabilities(PRISONERS_DILEMMA, size, intensity=0.5)[1, 0]
+    counts = moran(PRISONERS_DILEMMA, [size - 1, 1], 10_000, intensity=0.5, replicates=replicates, seed=1)
+    assert np.all(counts.max(axis=1) == size)  # Every replicate fixated
+    observed = np.mean(counts[:, 1] == size)
+    assert abs(observed - rho) < 4 * np.sqrt(rho * (1 - rho) / replicates)
+
+def test_moran_mutation_with_a_single_strategy():
+    assert moran([[1.0]], [5], 10, mutation=0.1, replicates=3, seed=0).tolist() == [[5]] * 3
@@ -0,0 +1,37 @@
+import itertools
+
+import pytest
+
+import Games
+from strategies import (STRATEGIES, GenerousTitForTatPlayer, GrimTriggerPlayer, RandomPlayer,
+                        RuthlessTitForTatPlayer, TitForTatPlayer, declared)
+
+def scalar(player_class):
+    """player_class without its kernel (or any metadata), so Games plays it round by round"""
+    def choose_action(self, opponents):
+        return player_class.choose_action(self, opponents)
+    return type(player_class.__name__, (player_class,), {'__slots__': (), 'choose_action': choose_action})
+
+def average_scores(pairings, simulations, method='simulate'):
+    results = Games.run_simulations(pairings, 50, simulations, seed=3, method=method)
+    return [(result['player1_average_score'], result['player2_average_score']) for result in results]
+
+def test_batched_engine_equals_the_scalar_one_on_deterministic_pairs():
+    deterministic = [cls for cls in STRATEGIES.values() if declared(cls, 'deterministic')]
+    pairings = list(itertools.product(deterministic, deterministic))
+    batched = average_scores(pairings, 3)
+    assert batched == average_scores([(scalar(cls1), scalar(cls2)) for cls1, cls2 in pairings], 3)
+
+@pytest.mark.parametrize('player1_class, player2_class', [
+    (TitForTatPlayer, RandomPlayer),
+    (GenerousTitForTatPlayer, RandomPlayer),
+    (RuthlessTitForTatPlayer, GenerousTitForTatPlayer),
+    (RandomPlayer, GrimTriggerPlayer),
+])
+def test_both_engines_average_to_the_exact_scores(player1_class, player2_class):
+    # 50 rounds, 500 replicates: a standard error of at most about 0.5
+    exact, = average_scores([(player1_class, player2_class)], 1, method='exact')
+    batched, = average_scores([(player1_class, player2_class)], 500)
+    played, = average_scores([(scalar(player1_class), scalar(player2_class))], 500)
+    assert batched == pytest.approx(exact, abs=2.5)
+    assert played == pytest.approx(exact, abs=2.5)
@@ -0,0 +1,40 @@
+import numpy as np
+
+import machines
+from actions import COOPERATE, DEFECT
+from strategies import Player, RandomPlayer, TitForTatPlayer
+from tournament_dilemma import play_match
+
+WIN_STAY_LOSE_SHIFT = machines.lookup_table([0, 1, 1, 0])
+
+class WinStayLoseShift(Player):
+    __slots__ = ()
+
+    def choose_action(self, opponents):
+        if self.last_action is None:
+            return COOPERATE
+        if opponents[0].last_action == COOPERATE:
+            return self.last_action
+        return COOPERATE if self.last_action == DEFECT else DEFECT
+
+def test_machines_follow_the_moves_actually_played():
+    machine_class = machines.machine_player('MachineWinStayLoseShift', WIN_STAY_LOSE_SHIFT)
+    # Its cooperation was flipped to a defection against a cooperation: a win, so it defects again
+    player, opponent = machine_class(), TitForTatPlayer()
+    player.choose_action([opponent])
+    player.last_action, opponent.last_action = DEFECT, COOPERATE
+    assert player.choose_action([opponent]) == DEFECT
+    state = machine_class.init_batch_state(1)
+    machine_class.choose_batch(state, np.zeros(1), np.zeros(1), np.ones(1), None, np.zeros(1, dtype=bool))
+    assert machine_class.choose_batch(state, np.ones(1), np.zeros(1), np.ones(1), None, np.ones(1, dtype=bool))[0]
+
+def test_noisy_machine_matches_equal_their_strategy():
+    machine_class = machines.machine_player('MachineWinStayLoseShift', WIN_STAY_LOSE_SHIFT)
+    for opponent_class in (TitForTatPlayer, RandomPlayer):
+        for seed in range(5):
+            outcomes = []
+            for player_class in (machine_class, WinStayLoseShift):
+                player1, player2 = player_class(), opponent_class()
+                score = play_match(player1, player2, seed=seed, noise=0.1, misperception=0.05)
+                outcomes.append((score, player1.score, player2.score))
+            assert outcomes[0] == outcomes[1]
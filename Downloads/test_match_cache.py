@@ -0,0 +1,23 @@
+import sqlite3
+
+from match_cache import MatchCache
+from tournament_dilemma import RandomPlayer, RuthlessTitForTatPlayer, TitForTatPlayer, run_tournament
+
+PLAYERS = [TitForTatPlayer, RandomPlayer, RuthlessTitForTatPlayer]
+
+def standings(players, results):
+    return [(type(player).__name__, player.elo_rating) for player in players], dict(results)
+
+def test_cached_seeded_tournament_equals_uncached():
+    uncached = standings(*run_tournament(PLAYERS, matches_per_pair=3, seed=7))
+    cache = MatchCache()
+    for workers in (2, 2, 1):  # Filling the cache, served from it, serial
+        cached = run_tournament(PLAYERS, matches_per_pair=3, seed=7, workers=workers, cache=cache)
+        assert standings(*cached) == uncached
+
+def test_persistent_cache_is_committed_without_close(tmp_path):
+    path = tmp_path / 'matches.db'
+    cache = MatchCache(path=str(path))
+    run_tournament(PLAYERS, matches_per_pair=3, seed=7, cache=cache)
+    rows = sqlite3.connect(path).execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+    assert rows == 3 * 3
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from Nprisonersdilemma import PAYOFF, NPlayerGame, run_simulation
+from strategies import STRATEGIES, RandomPlayer, declared
+from topology import Topology
+
+DETERMINISTIC = sorted((cls for cls in STRATEGIES.values() if declared(cls, 'deterministic')),
+                       key=lambda cls: cls.__name__)
+
+@pytest.mark.parametrize('topology', [None, Topology.ring(30, 4), Topology.watts_strogatz(30, 4, 0.3, seed=1)])
+def test_population_kernels_equal_round_by_round_play(topology):
+    population = [DETERMINISTIC[k % len(DETERMINISTIC)] for k in range(30)]
+    players = [cls() for cls in population]
+    run_simulation(players, 20, topology=topology)
+    scores = NPlayerGame(population, interaction=topology, seed=0).run(20)
+    assert scores.tolist() == [player.score for player in players]
+
+def test_random_population_earns_the_expected_payoff():
+    # Every encounter is uniform over the four outcomes
+    n, rounds = 200, 50
+    expected = rounds * (n - 1) * sum(PAYOFF.values) / 4
+    scores = NPlayerGame([RandomPlayer] * n, seed=2).run(rounds)
+    assert scores.mean() == pytest.approx(expected, rel=0.02)
+    assert np.ptp(scores) > 0
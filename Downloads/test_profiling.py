@@ -0,0 +1,13 @@
+import Games
+import machines
+from profiling import Profiler
+from strategies import RandomPlayer
+
+def test_profiler_wraps_machine_kernels():
+    machine_class = machines.machine_player('MachineTitForTat', machines.TIT_FOR_TAT)
+    expected = Games.run_simulation(machine_class, RandomPlayer, rounds=50, simulations=4, seed=1)
+    with Profiler(classes=[machine_class]) as profiler:
+        assert Games.run_simulation(machine_class, RandomPlayer, rounds=50, simulations=4, seed=1) == expected
+    assert ('choose_batch', 'MachineTitForTat') in profiler.stats
+    assert isinstance(vars(machines.MachinePlayer)['choose_batch'], classmethod)
+    assert vars(machine_class)['choose_batch'] is vars(machines.MachinePlayer)['choose_batch']
@@ -0,0 +1,37 @@
+import math
+
+import numpy as np
+import pytest
+
+from ratings import bradley_terry, elo, glicko2, rate
+from tournament_dilemma import GrimTriggerPlayer, RandomPlayer, TitForTatPlayer, run_tournament
+
+def test_elo_replays_the_tournament_ratings():
+    log = []
+    players, _ = run_tournament([TitForTatPlayer, RandomPlayer, GrimTriggerPlayer], matches_per_pair=4, seed=3,
+                                match_log=log)
+    player_a, player_b, score = zip(*log)
+    ratings = elo(player_a, player_b, score, n=len(players))
+    assert ratings == pytest.approx([player.elo_rating for player in players])
+
+def test_bradley_terry_recovers_the_win_ratio():
+    # 3 wins in 4 games: strengths 3 to 1, i.e. 400 * log10(3) ELO points apart
+    ratings = bradley_terry([0, 0, 0, 0], [1, 1, 1, 1], [1, 1, 1, 0], prior=1e-9)
+    assert ratings[0] - ratings[1] == pytest.approx(400 * math.log10(3), abs=1e-3)
+    # The order of the log does not matter
+    assert bradley_terry([1, 0, 0, 0], [0, 1, 1, 1], [1, 1, 1, 1]) == pytest.approx(
+        bradley_terry([0, 0, 0, 1], [1, 1, 1, 0], [1, 1, 1, 1]))
+
+def test_glicko2_matches_glickmans_example():
+    # Glickman's worked example: a 1500 (RD 200) player beats a 1400 (RD 30)
+    # one and loses to a 1550 (RD 100) and a 1700 (RD 300) one
+    ratings, deviations, volatilities = glicko2([0, 0, 0], [1, 2, 3], [1, 0, 0], initial=[1500, 1400, 1550, 1700],
+                                                deviation=[200, 30, 100, 300])
+    assert ratings[0] == pytest.approx(1464.06, abs=0.01)
+    assert deviations[0] == pytest.approx(151.52, abs=0.01)
+    assert volatilities[0] == pytest.approx(0.05999, abs=1e-5)
+
+def test_rate_rejects_unknown_methods():
+    assert np.array_equal(rate([0], [1], [1]), elo([0], [1], [1]))
+    with pytest.raises(ValueError):
+        rate([0], [1], [1], method='trueskill')
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+import Games
+from recorder import MatchLog, MatchRecorder
+from tournament_dilemma import MATCH_ROUNDS, GrimTriggerPlayer, RandomPlayer, TitForTatPlayer, run_tournament
+
+PLAYERS = [TitForTatPlayer, RandomPlayer, GrimTriggerPlayer]
+
+def record_tournament(path, format):
+    with MatchRecorder(str(path), format=format, chunk=128) as recorder:
+        _, results = run_tournament(PLAYERS, matches_per_pair=2, seed=5, recorder=recorder)
+    return MatchLog(str(path)), results
+
+def test_recorded_tournament_adds_up_to_its_scores(tmp_path):
+    log, results = record_tournament(tmp_path / 'memmap', 'memmap')
+    assert len(log.matches) == 3 * 2
+    assert len(log) == len(log.matches) * MATCH_ROUNDS
+    totals = dict.fromkeys(results, 0.0)
+    for k, match in enumerate(log.matches):
+        rows = log.match(k)
+        assert np.array_equal(rows['round'], np.arange(MATCH_ROUNDS))
+        totals[match['player1']] += rows['payoff1'].sum()
+        totals[match['player2']] += rows['payoff2'].sum()
+    assert totals == pytest.approx({name: result['total_score'] for name, result in results.items()})
+
+def test_formats_hold_the_same_rows(tmp_path):
+    memmap, _ = record_tournament(tmp_path / 'memmap', 'memmap')
+    npz, _ = record_tournament(tmp_path / 'npz', 'npz')
+    for name in ('match', 'round', 'action1', 'action2', 'payoff1', 'payoff2'):
+        assert np.array_equal(memmap.column(name), npz.column(name))
+
+def test_recorded_simulation_matches_its_average(tmp_path):
+    with MatchRecorder(str(tmp_path)) as recorder:
+        result = Games.run_simulation(TitForTatPlayer, RandomPlayer, 50, 8, seed=2, recorder=recorder)
+    log = MatchLog(str(tmp_path))
+    payoff1 = log.column('payoff1')
+    total = sum(payoff1[log.column('match') == k].sum() * match['copies'] for k, match in enumerate(log.matches))
+    assert sum(match['copies'] for match in log.matches) == 8
+    assert total / 8 == pytest.approx(result['player1_average_score'])
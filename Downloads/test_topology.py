@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from topology import Topology
+
+def dense(topology):
+    matrix = np.zeros((topology.n, topology.n))
+    weights = np.ones(topology.num_edges) if topology.weights is None else topology.weights
+    np.add.at(matrix, (topology.rows, topology.indices), weights)
+    return matrix
+
+def assert_simple_undirected(topology):
+    matrix = dense(topology)
+    assert np.array_equal(matrix, matrix.T)
+    assert not np.diag(matrix).any()
+    assert matrix.max() == 1  # No repeated edges
+
+def test_ring():
+    ring = Topology.ring(10, 4)
+    assert_simple_undirected(ring)
+    assert np.all(ring.degree == 4)
+    assert sorted(ring.neighbours(0).tolist()) == [1, 2, 8, 9]
+
+@pytest.mark.parametrize('neighbourhood, degree, corner', [('von_neumann', 4, 2), ('moore', 8, 3)])
+def test_lattice(neighbourhood, degree, corner):
+    periodic = Topology.lattice(5, 6, neighbourhood)
+    assert_simple_undirected(periodic)
+    assert np.all(periodic.degree == degree)
+    bounded = Topology.lattice(5, 6, neighbourhood, periodic=False)
+    assert_simple_undirected(bounded)
+    assert bounded.degree[0] == corner and bounded.degree.max() == degree
+
+def test_watts_strogatz():
+    assert np.array_equal(dense(Topology.watts_strogatz(20, 4, 0.0, seed=1)), dense(Topology.ring(20, 4)))
+    rewired = Topology.watts_strogatz(50, 4, 1.0, seed=1)
+    assert_simple_undirected(rewired)
+    assert rewired.num_edges == 50 * 4
+    assert np.array_equal(dense(rewired), dense(Topology.watts_strogatz(50, 4, 1.0, seed=1)))
+    assert not np.array_equal(dense(rewired), dense(Topology.ring(50, 4)))
+
+def test_barabasi_albert():
+    n, m = 200, 3
+    graph = Topology.barabasi_albert(n, m, seed=2)
+    assert_simple_undirected(graph)
+    assert graph.num_edges == 2 * m * (n - m)
+    assert graph.degree[m:].min() >= m
+    # Preferential attachment: the oldest agents gather the most links
+    assert graph.degree[:10].mean() > 3 * graph.degree[-100:].mean()
+
+def test_weighted_neighbour_sum_matches_the_dense_product():
+    matrix = np.array([[0, 2, 0], [1, 0, 0.5], [0, 3, 0]])
+    topology = Topology.from_matrix(matrix)
+    values = np.array([1.0, 10.0, 100.0])
+    assert topology.neighbour_sum(values) == pytest.approx(matrix @ values)
+    assert topology.degree == pytest.approx(matrix.sum(axis=1))
+    with pytest.raises(ValueError):
+        Topology.ring(10, 3)
@@ -0,0 +1,147 @@
+import numpy as np
+from randomness import make_rng
+
+class Topology:
+    """Interaction graph stored as CSR adjacency arrays
+
+    Agent i plays against indices[indptr[i]:indptr[i + 1]], with the
+    matching entries of weights (all ones when weights is None). Per-round
+    work over a Topology scales with the number of edges, not N^2."""
+
+    def __init__(self, indptr, indices, weights=None):
+        self.indptr = np.asarray(indptr, dtype=np.intp)
+        self.indices = np.asarray(indices, dtype=np.intp)
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        self.n = len(self.indptr) - 1
+        if self.indptr[0] != 0 or self.indptr[-1] != len(self.indices) or np.any(np.diff(self.indptr) < 0):
+            raise ValueError("indptr must start at 0, be non-decreasing and end at len(indices)")
+        if len(self.indices) and (self.indices.min() < 0 or self.indices.max() >= self.n):
+            raise ValueError(f"neighbour indices must lie in [0, {self.n})")
+        if self.weights is not None and self.weights.shape != self.indices.shape:
+            raise ValueError("weights must have one entry per edge")
+
+        # Row of every stored edge, so per-agent sums are a single bincount
+        self.rows = np.repeat(np.arange(self.n), np.diff(self.indptr))
+        if self.weights is None:
+            self.degree = np.diff(self.indptr).astype(np.float64)
+        else:
+            self.degree = np.bincount(self.rows, weights=self.weights, minlength=self.n)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def neighbours(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def neighbour_sum(self, values):
+        """(Weighted) sum of values over each agent's neighbours"""
+        gathered = values[self.indices]
+        if self.weights is not None:
+            gathered = gathered * self.weights
+        return np.bincount(self.rows, weights=gathered, minlength=self.n)
+
+    def __repr__(self):
+        return f"Topology(n={self.n}, edges={self.num_edges})"
+
+    @classmethod
+    def from_edges(cls, n, edges, weights=None, directed=False):
+        """Build from an (E, 2) edge list; undirected edges are stored both ways"""
+        edges = np.asarray(edges, dtype=np.intp).reshape(-1, 2)
+        src, dst = edges[:, 0], edges[:, 1]
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+        if not directed:
+            src, dst = np.concatenate((src, dst)), np.concatenate((dst, src))
+            if weights is not None:
+                weights = np.concatenate((weights, weights))
+        order = np.lexsort((dst, src))
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(src, minlength=n))))
+        return cls(indptr, dst[order], None if weights is None else weights[order])
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """Build from a dense N x N weight matrix (zero means no interaction)"""
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+            raise ValueError(f"interaction matrix must be square, got shape {matrix.shape}")
+        src, dst = np.nonzero(matrix)
+        weights = matrix[src, dst]
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(src, minlength=len(matrix)))))
+        return cls(indptr, dst, None if np.all(weights == 1) else weights)
+
+    @classmethod
+    def ring(cls, n, k=2):
+        """Each agent plays its k nearest neighbours on a circle (k even)"""
+        if k % 2 or not 0 < k < n:
+            raise ValueError(f"k must be even and between 0 and n={n}, got {k}")
+        agents = np.arange(n)
+        edges = [np.column_stack((agents, (agents + step) % n)) for step in range(1, k // 2 + 1)]
+        return cls.from_edges(n, np.concatenate(edges))
+
+    @classmethod
+    def lattice(cls, rows, cols, neighbourhood='von_neumann', periodic=True):
+        """2D grid where agent r * cols + c plays its 4 (von_neumann) or 8 (moore) neighbours"""
+        if neighbourhood == 'von_neumann':
+            offsets = [(0, 1), (1, 0)]
+        elif neighbourhood == 'moore':
+            offsets = [(0, 1), (1, 0), (1, 1), (1, -1)]
+        else:
+            raise ValueError(f"Unknown neighbourhood {neighbourhood!r}, expected 'von_neumann' or 'moore'")
+
+        r, c = np.divmod(np.arange(rows * cols), cols)
+        edges = []
+        for dr, dc in offsets:
+            r2, c2 = r + dr, c + dc
+            if periodic:
+                keep = np.ones(len(r), dtype=bool)
+                r2, c2 = r2 % rows, c2 % cols
+            else:
+                keep = (r2 < rows) & (c2 >= 0) & (c2 < cols)
+            edges.append(np.column_stack((r * cols + c, r2 * cols + c2))[keep])
+        edges = np.concatenate(edges)
+        # Tiny periodic grids can wrap onto themselves; drop self loops and repeats
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        edges = np.unique(np.sort(edges, axis=1), axis=0)
+        return cls.from_edges(rows * cols, edges)
+
+    @classmethod
+    def watts_strogatz(cls, n, k, p, seed=None):
+        """Ring of degree k whose edges are each rewired with probability p"""
+        if k % 2 or not 0 < k < n:
+            raise ValueError(f"k must be even and between 0 and n={n}, got {k}")
+        rng = make_rng(seed)
+        agents = np.arange(n)
+        edges = np.concatenate([np.column_stack((agents, (agents + step) % n))
+                                for step in range(1, k // 2 + 1)])
+        existing = set(map(tuple, np.sort(edges, axis=1).tolist()))
+        for e in np.flatnonzero(rng.random(len(edges)) < p):
+            u, v = edges[e]
+            # Redraw the far end, avoiding self loops and duplicate edges
+            for w in rng.integers(n, size=16).tolist():
+                edge = (min(u, w), max(u, w))
+                if w != u and edge not in existing:
+                    existing.discard((min(u, v), max(u, v)))
+                    existing.add(edge)
+                    edges[e, 1] = w
+                    break
+        return cls.from_edges(n, edges)
+
+    @classmethod
+    def barabasi_albert(cls, n, m, seed=None):
+        """Preferential attachment: each new agent links to m existing agents"""
+        if not 0 < m < n:
+            raise ValueError(f"m must be between 0 and n={n}, got {m}")
+        rng = make_rng(seed)
+        edges = []
+        # Every endpoint is listed once per edge, so uniform picks from it
+        # are proportional to degree.
+        endpoints = list(range(m))
+        for new in range(m, n):
+            targets = set()
+            while len(targets) < m:
+                targets.add(endpoints[int(rng.integers(len(endpoints)))])
+            for target in targets:
+                edges.append((new, target))
+                endpoints.extend((new, target))
+        return cls.from_edges(n, edges)
@@ -1,156 +1,43 @@
-import random
-import matplotlib.pyplot as plt
 import numpy as np
 from collections import defaultdict
 import math
-
-class Player:
-    def __init__(self):
-        self.last_action = None
-        self.score = 0  # Initialize score
-        self.elo_rating = 1200  # Starting ELO rating
-        
-    def update_score(self, reward):
-        self.score += reward
-    
-    def reset_score(self):
-        self.score = 0
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from actions import parse_action
+import machines
+from match_cache import is_deterministic_pair, match_key
+from memory_one import declared_memory_one, is_deterministic, solve_match
+import noise as trembling
+from payoff import CLASSIC
+import ratings as rating_systems
+from randomness import keyed_child, make_rng, spawn
+from reporting import TextReporter
+from strategies import (Player, TitForTatPlayer, TitForTatMixedPlayer, RandomPlayer, GrimTriggerPlayer,
+                        GrimTriggerMixPlayer, ForgivingTitForTatPlayer, RuthlessTitForTatPlayer,
+                        SuperForgivingPlayer, SuperUnforgivingPlayer)
 
 class HumanPlayer(Player):
-    def __init__(self):
-        super().__init__()
+    __slots__ = ()
+
+    def __init__(self, rng=None):
+        super().__init__(rng)
         
     def choose_action(self, opponents):
         print(f"\n--- Your turn ---")
         print(f"Your current score: {self.score}")
         print("Opponents' last actions:")
         for i, opponent in enumerate(opponents):
-            last_action = opponent.last_action if opponent.last_action else "None (first round)"
+            last_action = opponent.last_action if opponent.last_action is not None else "None (first round)"
             print(f"  Opponent {i+1} ({type(opponent).__name__}): {last_action}")
         
         while True:
-            choice = input("Choose your action (c for cooperate, d for defect): ").lower().strip()
-            if choice in ['c', 'cooperate']:
-                return 'cooperate'
-            elif choice in ['d', 'defect']:
-                return 'defect'
+            choice = parse_action(input("Choose your action (c for cooperate, d for defect): "))
+            if choice is not None:
+                return choice
             else:
                 print("Invalid input. Please enter 'c' for cooperate or 'd' for defect.")
 
-class TitForTatPlayer(Player):
-    def __init__(self):
-        super().__init__()
-        
-    def choose_action(self, opponents):
-        for opponent in opponents:
-            if opponent.last_action == 'defect':
-                return "defect" 
-        return 'cooperate'
-
-class TitForTatMixedPlayer(Player):  # Fixed typo in class name
-    def __init__(self):
-        super().__init__()
-        
-    def choose_action(self, opponents):
-        n_defect = 0
-        n_cooperate = 0
-        for opponent in opponents:
-            if opponent.last_action == 'defect':
-                n_defect += 1
-            elif opponent.last_action == 'cooperate':  # Fixed logic
-                n_cooperate += 1
-        if n_cooperate >= n_defect:
-            return "cooperate"
-        else:
-            return "defect"
-
-class RandomPlayer(Player):
-    def __init__(self):
-        super().__init__()
-        
-    def choose_action(self, opponents):  # Fixed parameter
-        return random.choice(["cooperate", "defect"])
-    
-class GrimTriggerPlayer(Player):
-    def __init__(self):
-        super().__init__()
-        self.triggered = False
-        
-    def choose_action(self, opponents):
-        for opponent in opponents:
-            if opponent.last_action == 'defect':  # Fixed logic and typo
-                self.triggered = True
-                return 'defect'
-        if self.triggered:
-            return 'defect'
-        return 'cooperate'
-
-class GrimTriggerMixPlayer(Player):
-    def __init__(self):
-        super().__init__()
-        self.triggered = False
-        self.defect_count = 0
-        
-    def choose_action(self, opponents):
-        limit = 3
-        for opponent in opponents:
-            if opponent.last_action == 'defect':
-                self.defect_count += 1
-                if self.defect_count >= limit:
-                    self.triggered = True
-                    
-        if self.triggered:
-            return 'defect'
-        return 'cooperate'
-
-class ForgivingTitForTatPlayer(Player):
-    def __init__(self):
-        super().__init__()
-        
-    def choose_action(self, opponents):
-        n = len(opponents)  # Fixed variable name
-        cooperate_count = 0
-        for opponent in opponents:
-            if opponent.last_action == 'cooperate':
-                cooperate_count += 1  # Fixed operator
-                
-        if cooperate_count > n / 5:
-            return "cooperate"
-        elif any(opponent.last_action == 'defect' for opponent in opponents):
-            return "defect"
-        return "cooperate"
-
-class RuthlessTitForTatPlayer(Player):
-    def __init__(self):
-        super().__init__()
-        
-    def choose_action(self, opponents):
-        n = len(opponents)  # Fixed variable name
-        cooperate_count = 0
-        for opponent in opponents:
-            if opponent.last_action == 'cooperate':
-                cooperate_count += 1  # Fixed operator
-                
-        if cooperate_count > n / 5:
-            return "defect"
-        elif any(opponent.last_action == 'defect' for opponent in opponents):
-            return "defect"
-        return random.choice(["cooperate", "defect"])
-
-class SuperForgivingPlayer(Player):  # Fixed inheritance
-    def __init__(self):
-        super().__init__()
-        
-    def choose_action(self, opponents):
-        return "cooperate"
-
-class SuperUnforgivingPlayer(Player):  # Fixed inheritance and name
-    def __init__(self):
-        super().__init__()
-        
-    def choose_action(self, opponents):
-        return "defect"
-
 class ELOSystem:
     def __init__(self, k_factor=32):
         self.k_factor = k_factor
@@ -167,36 +54,73 @@ class ELOSystem:
         player_a.elo_rating += self.k_factor * (score_a - expected_a)
         player_b.elo_rating += self.k_factor * ((1 - score_a) - expected_b)
 
-def play_match(player1, player2, rounds=100):
-    """Play a match between two players and return the winner"""
-    # Reset scores for this match
-    player1.reset_score()
-    player2.reset_score()
+MATCH_ROUNDS = 100
+
+def play_match(player1, player2, rounds=MATCH_ROUNDS, payoff=CLASSIC, seed=None, method='auto', cache=None,
+               recorder=None, noise=0.0, misperception=0.0):
+    """Play a match between two players and return the winner
+
+    If seed is given, both players are reseeded from it before the match.
+    With method='auto', two deterministic memory-one strategies are scored
+    from their Markov chain instead of playing the rounds (same result);
+    method='simulate' always plays. With a MatchCache, deterministic pairs
+    and seeded matches are looked up before playing and stored after.
+    With a MatchRecorder every round is played (neither shortcut is
+    taken) and written to it. noise flips each move as it is played and
+    misperception each player's view of the other's last move, each with
+    that probability (see noise.py); noisy matches are always played and
+    only cached when seeded."""
+    if method not in ('auto', 'simulate'):
+        raise ValueError(f"Unknown method {method!r}, expected 'auto' or 'simulate'")
+    noisy = trembling.check(noise, misperception)
+    noise_seed = None
+    if seed is not None:
+        # The errors get a third child, so noiseless matches keep their seeds
+        seeds = spawn(seed, 3 if noisy else 2)
+        player1.seed(seeds[0])
+        player2.seed(seeds[1])
+        if noisy:
+            noise_seed = seeds[2]
+    
+    # Reset scores and any internal state for this match
+    player1.reset()
+    player2.reset()
     
-    # Reset any internal state
-    if hasattr(player1, 'triggered'):
-        player1.triggered = False
-    if hasattr(player2, 'triggered'):
-        player2.triggered = False
-    if hasattr(player1, 'defect_count'):
-        player1.defect_count = 0
-    if hasattr(player2, 'defect_count'):
-        player2.defect_count = 0
+    key = None
+    human = isinstance(player1, HumanPlayer) or isinstance(player2, HumanPlayer)
+    if cache is not None and not human and recorder is None:
+        key = match_key(type(player1), type(player2), rounds, payoff, seed,
+                        *((noise, misperception) if noisy else ()), stochastic=noisy)
+        cached = None if key is None else cache.get(key)
+        if cached is not None:
+            score, player1.score, player2.score = cached
+            return score
     
+    vector1 = declared_memory_one(type(player1))
+    vector2 = declared_memory_one(type(player2))
+    if (method == 'auto' and recorder is None and not noisy and vector1 is not None and vector2 is not None
+            and is_deterministic(vector1) and is_deterministic(vector2)):
+        player1.score, player2.score = solve_match(vector1, vector2, rounds, payoff)[:2]
+        rounds = 0  # Nothing left to play
+    elif (recorder is None and not noisy and machines.is_machine(type(player1))
+          and machines.is_machine(type(player2))):
+        # Two machines play the whole match as table lookups
+        scores1, scores2 = machines.play([(player1.machine, player2.machine)], rounds, payoff)
+        player1.score, player2.score = scores1[0].item(), scores2[0].item()
+        rounds = 0
+    
+    match_id = None if recorder is None else recorder.new_match(type(player1).__name__, type(player2).__name__)
+    errors = trembling.round_errors(make_rng(noise_seed), rounds, noise, misperception) if noisy else None
     for round_num in range(rounds):
         # Get actions
-        action1 = player1.choose_action([player2])
-        action2 = player2.choose_action([player1])
+        if errors is None:
+            action1 = player1.choose_action([player2])
+            action2 = player2.choose_action([player1])
+        else:
+            action1, action2 = trembling.noisy_actions(player1, player2, next(errors))
         
         # Calculate rewards
-        if action1 == 'cooperate' and action2 == 'cooperate':
-            reward1, reward2 = 3, 3
-        elif action1 == 'cooperate' and action2 == 'defect':
-            reward1, reward2 = 0, 5
-        elif action1 == 'defect' and action2 == 'cooperate':
-            reward1, reward2 = 5, 0
-        else:  # Both defect
-            reward1, reward2 = 1, 1
+        reward1, reward2 = payoff.outcomes[action1][action2]
             
         player1.update_score(reward1)
         player2.update_score(reward2)
@@ -204,9 +128,11 @@ def play_match(player1, player2, rounds=100):
         # Update last actions
         player1.last_action = action1
         player2.last_action = action2
+        if recorder is not None:
+            recorder.record(match_id, round_num, action1, action2, reward1, reward2)
         
         # Show round results for human player
-        if isinstance(player1, HumanPlayer) or isinstance(player2, HumanPlayer):
+        if human:
             print(f"Round {round_num + 1}: "
                   f"{type(player1).__name__} ({action1}) vs "
                   f"{type(player2).__name__} ({action2}) | "
@@ -214,14 +140,119 @@ def play_match(player1, player2, rounds=100):
     
     # Determine winner (1 for player1, 0.5 for tie, 0 for player2)
     if player1.score > player2.score:
-        return 1.0
+        score = 1.0
     elif player1.score < player2.score:
-        return 0.0
+        score = 0.0
     else:
-        return 0.5
+        score = 0.5
+    
+    if key is not None:
+        cache.put(key, (score, player1.score, player2.score))
+        cache.flush()
+    return score
+
+def _machine_outcomes(pairings, payoff):
+    """(score, score1, score2) of a noiseless match for each pairing of machine classes, in one pass"""
+    scores1, scores2 = machines.play([(cls1.machine, cls2.machine) for cls1, cls2 in pairings], MATCH_ROUNDS,
+                                     payoff)
+    return [(1.0 if score1 > score2 else 0.0 if score1 < score2 else 0.5, score1, score2)
+            for score1, score2 in zip(scores1.tolist(), scores2.tolist())]
+
+def _is_machine_pairing(pairing):
+    return machines.is_machine(pairing[0]) and machines.is_machine(pairing[1])
+
+def _play_pairing(task):
+    """Play every match of one pairing with fresh players (runs in a worker process)"""
+    player1_class, player2_class, match_seeds, payoff, noise, misperception = task
+    player1 = player1_class()
+    player2 = player2_class()
+    outcomes = []
+    for match_seed in match_seeds:
+        score = play_match(player1, player2, payoff=payoff, seed=match_seed, noise=noise,
+                           misperception=misperception)
+        outcomes.append((score, player1.score, player2.score))
+    return outcomes
 
-def run_tournament(player_classes, include_human=False, matches_per_pair=5):
-    """Run a round-robin tournament with ELO rankings"""
+def _play_pairings(pairings, pair_seeds, matches_per_pair, payoff, seeded, workers=1, chunksize=1, cache=None,
+                   noise=0.0, misperception=0.0):
+    """(score, score1, score2) of every match of each (class1, class2) pairing
+
+    Fully cached pairings come from the cache; noiseless pairings of
+    machines are all played here in one pass (their matches are identical)
+    and the rest here (workers=1) or on a process pool. Without a seed only
+    deterministic pairings without noise are cached."""
+    outcomes = [None] * len(pairings)
+    keys = [None] * len(pairings)
+    noisy = bool(noise or misperception)
+    extra = (noise, misperception) if noisy else ()
+    # Spawned once: spawning a SeedSequence again would give other children
+    match_seeds = [spawn(pair_seed, matches_per_pair) for pair_seed in pair_seeds]
+    if cache is not None:
+        for k, (player1_class, player2_class) in enumerate(pairings):
+            if not seeded and (noisy or not is_deterministic_pair(player1_class, player2_class)):
+                continue
+            keys[k] = [match_key(player1_class, player2_class, MATCH_ROUNDS, payoff, match_seed, *extra,
+                                 stochastic=noisy)
+                       for match_seed in match_seeds[k]]
+            cached = [cache.get(key) for key in keys[k]]
+            if all(outcome is not None for outcome in cached):
+                outcomes[k] = cached
+
+    missing = [k for k, outcome in enumerate(outcomes) if outcome is None]
+    automata = [k for k in missing if not noisy and _is_machine_pairing(pairings[k])]
+    for k, outcome in zip(automata, _machine_outcomes([pairings[k] for k in automata], payoff)):
+        outcomes[k] = [outcome] * matches_per_pair
+        for key in keys[k] or ():
+            cache.put(key, outcome)
+    missing = [k for k in missing if outcomes[k] is None]
+    tasks = [pairings[k] + (match_seeds[k], payoff, noise, misperception) for k in missing]
+    if not tasks:
+        played = []
+    elif workers == 1:
+        played = map(_play_pairing, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            played = list(executor.map(_play_pairing, tasks, chunksize=chunksize))
+    for k, pair_outcomes in zip(missing, played):
+        outcomes[k] = pair_outcomes
+        for key, outcome in zip(keys[k] or (), pair_outcomes):
+            cache.put(key, outcome)
+    if cache is not None:
+        cache.flush()
+    return outcomes
+
+def run_tournament(player_classes, include_human=False, matches_per_pair=5, payoff=CLASSIC,
+                   workers=1, chunksize=1, seed=None, cache=None, match_log=None, recorder=None, reporter=None,
+                   noise=0.0, misperception=0.0, checkpoint=None):
+    """Run a round-robin tournament with ELO rankings
+
+    With workers=1 matches are played one after another in this process.
+    Any other value (None meaning one per CPU) plays the pairings on a
+    process pool, handing out chunksize pairings per task; the match scores
+    are collected first and ELO updates are then applied in the same order
+    as a serial run. Every match is seeded from seed (None, an int, a
+    SeedSequence or a Generator) and the names of its two players, so a
+    given seed gives the same results for any worker count. With a
+    MatchCache, pairings already in the cache are not replayed (rerunning
+    after adding a strategy only plays its new pairings); without a seed
+    only deterministic pairings are cached. If match_log is a list, the
+    (i, j, score) of every match (i and j indexing the returned players)
+    is appended to it, ready for the ratings module. A MatchRecorder
+    receives every round of every match (serial tournaments only, and
+    without the cache). Progress goes to reporter (see reporting.py),
+    by default the classic text output. noise and misperception make
+    every match noisy, as in play_match. With a Checkpoint (see
+    checkpoint.py) every match is logged as it completes and a rerun with
+    the same log resumes: logged matches are replayed instead of played,
+    giving the results of an uninterrupted run."""
+    if include_human and workers != 1:
+        raise ValueError("A human player can only take part in a serial tournament (workers=1)")
+    if recorder is not None and workers != 1:
+        raise ValueError("Recording rounds needs a serial tournament (workers=1)")
+
+    if reporter is None:
+        reporter = TextReporter()
+    listening = reporter.listening
     elo_system = ELOSystem()
     
     # Create players
@@ -235,96 +266,266 @@ def run_tournament(player_classes, include_human=False, matches_per_pair=5):
     # Tournament results
     results = defaultdict(lambda: {'wins': 0, 'losses': 0, 'ties': 0, 'total_score': 0})
     
-    print(f"\n=== Starting Tournament ===")
-    print(f"Players: {[type(p).__name__ for p in players]}")
-    print(f"Matches per pair: {matches_per_pair}")
-    
     # Play all pairs
-    total_matches = len(players) * (len(players) - 1) // 2 * matches_per_pair
+    pairs = [(i, j) for i in range(len(players)) for j in range(i + 1, len(players))]  # Avoid duplicate matches
+    total_matches = len(pairs) * matches_per_pair
+    if listening:
+        reporter.emit('tournament_start', players=[type(p).__name__ for p in players],
+                      matches_per_pair=matches_per_pair, total=total_matches)
     match_count = 0
+    seeded = seed is not None
+    done = {}  # (pair index, match number) -> (score, score1, score2)
+    if checkpoint is not None:
+        # The log keeps the root seed, so resuming an unseeded run plays
+        # its remaining matches from the same seeds
+        seed, records = checkpoint.start({'run': 'tournament', 'players': [type(p).__name__ for p in players],
+                                          'matches_per_pair': matches_per_pair, 'payoff': payoff.values,
+                                          'noise': noise, 'misperception': misperception}, seed)
+        done = {(pair_index, match_num): outcome for pair_index, match_num, *outcome in records}
+    # Each pairing's seed depends only on the two strategies, so adding a
+    # strategy leaves the matches of every existing pairing unchanged.
+    pair_seeds = [keyed_child(seed, type(players[i]).__name__, type(players[j]).__name__) for i, j in pairs]
+
+    noisy = trembling.check(noise, misperception)
+
+    def pair_cache(i, j):
+        if cache is not None and (seeded
+                                  or not noisy and is_deterministic_pair(type(players[i]), type(players[j]))):
+            return cache
+        return None
+
+    machine_outcomes = {}
+    if workers != 1:
+        # With a checkpoint, played in batches of checkpoint.every matches,
+        # each logged as it comes back
+        pending = [k for k in range(len(pairs)) if any((k, m) not in done for m in range(matches_per_pair))]
+        size = max(1, len(pending) if checkpoint is None else checkpoint.every // matches_per_pair)
+        for start in range(0, len(pending), size):
+            batch = pending[start:start + size]
+            outcomes = _play_pairings([(type(players[pairs[k][0]]), type(players[pairs[k][1]])) for k in batch],
+                                      [pair_seeds[k] for k in batch], matches_per_pair, payoff, seeded, workers,
+                                      chunksize, cache, noise, misperception)
+            for pair_index, pair_outcomes in zip(batch, outcomes):
+                for match_num, outcome in enumerate(pair_outcomes):
+                    if (pair_index, match_num) not in done:
+                        done[pair_index, match_num] = outcome
+                        if checkpoint is not None:
+                            checkpoint.append((pair_index, match_num) + tuple(outcome))
+    elif recorder is None and not noisy:
+        # Every match between two machines, played up front in one pass
+        pairings = [(type(players[i]), type(players[j])) for i, j in pairs]
+        automata = [k for k, pairing in enumerate(pairings) if _is_machine_pairing(pairing)]
+        machine_outcomes = dict(zip(automata, _machine_outcomes([pairings[k] for k in automata], payoff)))
     
-    for i, player1 in enumerate(players):
-        for j, player2 in enumerate(players):
-            if i < j:  # Avoid duplicate matches
-                for match_num in range(matches_per_pair):
-                    match_count += 1
-                    print(f"\nMatch {match_count}/{total_matches}: "
-                          f"{type(player1).__name__} vs {type(player2).__name__} "
-                          f"(Game {match_num + 1})")
-                    
-                    score = play_match(player1, player2)
-                    
-                    # Update ELO ratings
-                    elo_system.update_ratings(player1, player2, score)
-                    
-                    # Update results
-                    p1_name = type(player1).__name__
-                    p2_name = type(player2).__name__
-                    
-                    results[p1_name]['total_score'] += player1.score
-                    results[p2_name]['total_score'] += player2.score
-                    
-                    if score == 1.0:
-                        results[p1_name]['wins'] += 1
-                        results[p2_name]['losses'] += 1
-                    elif score == 0.0:
-                        results[p2_name]['wins'] += 1
-                        results[p1_name]['losses'] += 1
+    # One commit to a persistent cache for the whole tournament
+    with nullcontext() if cache is None else cache.hold():
+        for pair_index, (i, j) in enumerate(pairs):
+            player1, player2 = players[i], players[j]
+            p1_name = type(player1).__name__
+            p2_name = type(player2).__name__
+            human = isinstance(player1, HumanPlayer) or isinstance(player2, HumanPlayer)
+            match_seeds = spawn(pair_seeds[pair_index], matches_per_pair)
+            for match_num in range(matches_per_pair):
+                match_count += 1
+                if listening:
+                    reporter.emit('match_start', match=match_count, total=total_matches, game=match_num + 1,
+                                  player1=p1_name, player2=p2_name)
+                    if human:
+                        reporter.flush()  # Show everything before prompting
+            
+                if (pair_index, match_num) in done:
+                    score, score1, score2 = done[pair_index, match_num]
+                else:
+                    if pair_index in machine_outcomes:
+                        score, score1, score2 = machine_outcomes[pair_index]
                     else:
-                        results[p1_name]['ties'] += 1
-                        results[p2_name]['ties'] += 1
-                    
-                    print(f"Result: {type(player1).__name__} {player1.score} - "
-                          f"{player2.score} {type(player2).__name__}")
-                    print(f"ELO Ratings: {type(player1).__name__}: {player1.elo_rating:.1f}, "
-                          f"{type(player2).__name__}: {player2.elo_rating:.1f}")
+                        score = play_match(player1, player2, payoff=payoff, seed=match_seeds[match_num],
+                                           cache=pair_cache(i, j), recorder=recorder, noise=noise,
+                                           misperception=misperception)
+                        score1, score2 = player1.score, player2.score
+                    if checkpoint is not None:
+                        checkpoint.append((pair_index, match_num, score, score1, score2))
+            
+                # Update ELO ratings
+                elo_system.update_ratings(player1, player2, score)
+                if match_log is not None:
+                    match_log.append((i, j, score))
+            
+                # Update results
+                results[p1_name]['total_score'] += score1
+                results[p2_name]['total_score'] += score2
+            
+                if score == 1.0:
+                    results[p1_name]['wins'] += 1
+                    results[p2_name]['losses'] += 1
+                elif score == 0.0:
+                    results[p2_name]['wins'] += 1
+                    results[p1_name]['losses'] += 1
+                else:
+                    results[p1_name]['ties'] += 1
+                    results[p2_name]['ties'] += 1
+            
+                if listening:
+                    reporter.emit('match', match=match_count, total=total_matches, game=match_num + 1,
+                                  player1=p1_name, player2=p2_name, score=score, score1=score1, score2=score2,
+                                  elo1=player1.elo_rating, elo2=player2.elo_rating)
     
+    if checkpoint is not None:
+        checkpoint.write()
+    if listening:
+        reporter.emit('tournament_end')
+        reporter.flush()
     return players, results
 
-def display_rankings(players, results):
-    """Display final rankings and statistics"""
+class Tournament:
+    """Round-robin tournament state that grows one strategy at a time
+
+    Keeps a results matrix, the score history of every pairing and the
+    match log the ratings are computed from, so add_strategy only plays
+    the new strategy's N pairings. Pairings are seeded from seed and the
+    two strategy names exactly as in run_tournament, and ELO ratings are
+    recomputed by replaying the log in run_tournament's order, so the
+    rankings equal those of a full run over the same classes."""
+
+    def __init__(self, player_classes=(), matches_per_pair=5, payoff=CLASSIC, seed=None,
+                 workers=1, chunksize=1, cache=None):
+        self.matches_per_pair = matches_per_pair
+        self.payoff = payoff
+        # Without a seed, fix fresh entropy now so every later addition
+        # draws from the same root
+        self.seeded = seed is not None
+        self.seed = seed if self.seeded else np.random.SeedSequence()
+        self.workers = workers
+        self.chunksize = chunksize
+        self.cache = cache
+        self.classes = []
+        self.wins = np.zeros((0, 0), dtype=np.int64)  # wins[i, j]: matches i won against j
+        self.ties = np.zeros((0, 0), dtype=np.int64)
+        self.points = np.zeros((0, 0), dtype=np.result_type(*payoff.values))  # points[i, j]: total score of i against j
+        self.history = {}  # (name1, name2) -> [(score, score1, score2), ...]
+        self.log = []  # (i, j, score) for every match, i < j
+        self.add_strategies(player_classes)
+
+    @property
+    def names(self):
+        return [player_class.__name__ for player_class in self.classes]
+
+    def add_strategy(self, player_class):
+        """Add one strategy and play only its pairings with the existing ones"""
+        self.add_strategies([player_class])
+
+    def add_strategies(self, player_classes):
+        """Add several strategies, playing all of their new pairings in one batch"""
+        player_classes = list(player_classes)
+        names = set(self.names)
+        for player_class in player_classes:
+            if issubclass(player_class, HumanPlayer):
+                raise ValueError("A human player can only take part in run_tournament")
+            if player_class.__name__ in names:
+                raise ValueError(f"{player_class.__name__} is already in the tournament")
+            names.add(player_class.__name__)
+        if not player_classes:
+            return
+
+        old = len(self.classes)
+        self.classes.extend(player_classes)
+        n = len(self.classes)
+        grow = ((0, n - old), (0, n - old))
+        self.wins = np.pad(self.wins, grow)
+        self.ties = np.pad(self.ties, grow)
+        self.points = np.pad(self.points, grow)
+
+        pairs = [(i, j) for j in range(old, n) for i in range(j)]
+        pairings = [(self.classes[i], self.classes[j]) for i, j in pairs]
+        pair_seeds = [keyed_child(self.seed, cls1.__name__, cls2.__name__) for cls1, cls2 in pairings]
+        outcomes = _play_pairings(pairings, pair_seeds, self.matches_per_pair, self.payoff, self.seeded,
+                                  self.workers, self.chunksize, self.cache)
+
+        for (i, j), (cls1, cls2), pair_outcomes in zip(pairs, pairings, outcomes):
+            self.history[cls1.__name__, cls2.__name__] = pair_outcomes
+            for score, score1, score2 in pair_outcomes:
+                self.log.append((i, j, score))
+                self.points[i, j] += score1
+                self.points[j, i] += score2
+                if score == 1.0:
+                    self.wins[i, j] += 1
+                elif score == 0.0:
+                    self.wins[j, i] += 1
+                else:
+                    self.ties[i, j] += 1
+                    self.ties[j, i] += 1
+
+    def match_log(self):
+        """(player_a, player_b, score) arrays in run_tournament's order"""
+        # Pairing (i, j) row by row, matches in turn
+        log = np.array(sorted(self.log, key=lambda match: match[:2]), dtype=np.float64).reshape(-1, 3)
+        return log[:, 0].astype(np.intp), log[:, 1].astype(np.intp), log[:, 2]
+
+    def ratings(self, method='elo', **kwargs):
+        """One rating per strategy from the ratings module ('elo', 'bradley_terry' or 'glicko2')"""
+        return rating_systems.rate(*self.match_log(), method=method, n=len(self.classes), **kwargs)
+
+    def players(self, method='elo', **kwargs):
+        """Fresh players whose elo_rating holds their rating under method"""
+        players = [player_class() for player_class in self.classes]
+        for player, rating in zip(players, self.ratings(method, **kwargs).tolist()):
+            player.elo_rating = rating
+        return players
+
+    def results(self):
+        """Per-strategy wins, losses, ties and total score, as run_tournament returns them"""
+        losses = self.wins.sum(axis=0)
+        return {name: {'wins': int(self.wins[i].sum()), 'losses': int(losses[i]),
+                       'ties': int(self.ties[i].sum()), 'total_score': self.points[i].sum().item()}
+                for i, name in enumerate(self.names)}
+
+    def save(self, path):
+        """Pickle the state (without its cache) to path"""
+        state = dict(vars(self), cache=None)
+        with open(path, 'wb') as f:
+            pickle.dump(state, f)
+
+    @classmethod
+    def load(cls, path, cache=None):
+        """Tournament saved by save(), optionally attached to a MatchCache"""
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        tournament = cls.__new__(cls)
+        vars(tournament).update(state, cache=cache)
+        return tournament
+
+def display_rankings(players, results, ratings=None):
+    """Display final rankings and statistics
+
+    ratings (one per player, e.g. from the ratings module) replace the
+    players' ELO ratings for sorting and display."""
+    label = 'ELO' if ratings is None else 'Rating'
+    if ratings is None:
+        ratings = [player.elo_rating for player in players]
     print(f"\n{'='*60}")
     print("FINAL TOURNAMENT RESULTS")
     print(f"{'='*60}")
     
     # Sort by ELO rating
-    players_sorted = sorted(players, key=lambda p: p.elo_rating, reverse=True)
+    ranked = sorted(zip(players, ratings), key=lambda entry: entry[1], reverse=True)
     
-    print(f"\n{'Rank':<4} {'Player':<25} {'ELO':<8} {'W-L-T':<10} {'Total Score':<12}")
+    print(f"\n{'Rank':<4} {'Player':<25} {label:<8} {'W-L-T':<10} {'Total Score':<12}")
     print("-" * 65)
     
-    for rank, player in enumerate(players_sorted, 1):
+    for rank, (player, rating) in enumerate(ranked, 1):
         name = type(player).__name__
         w = results[name]['wins']
         l = results[name]['losses']
         t = results[name]['ties']
         total_score = results[name]['total_score']
         
-        print(f"{rank:<4} {name:<25} {player.elo_rating:<8.1f} "
+        print(f"{rank:<4} {name:<25} {rating:<8.1f} "
               f"{w}-{l}-{t:<7} {total_score:<12}")
 
-def plot_elo_ratings(players):
-    """Create a bar chart of final ELO ratings"""
-    names = [type(player).__name__ for player in players]
-    ratings = [player.elo_rating for player in players]
-    
-    plt.figure(figsize=(12, 8))
-    bars = plt.bar(names, ratings, color=['red' if 'Human' in name else 'blue' for name in names])
-    
-    # Add rating values on top of bars
-    for bar, rating in zip(bars, ratings):
-        plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 5,
-                f'{rating:.0f}', ha='center', va='bottom')
-    
-    plt.axhline(y=1200, color='gray', linestyle='--', alpha=0.7, label='Starting ELO (1200)')
-    plt.xlabel('Players')
-    plt.ylabel('ELO Rating')
-    plt.title('Final ELO Ratings - Prisoner\'s Dilemma Tournament')
-    plt.xticks(rotation=45, ha='right')
-    plt.legend()
-    plt.tight_layout()
-    plt.grid(axis='y', alpha=0.3)
-    plt.show()
+def plot_elo_ratings(players, ratings=None):
+    """Create a bar chart of final ELO ratings (see plotting.plot_elo_ratings)"""
+    import plotting
+    plotting.plot_elo_ratings(players, ratings)
 
 def main():
     print("Welcome to the Enhanced Prisoner's Dilemma Tournament!")